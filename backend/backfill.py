@@ -0,0 +1,37 @@
+import json
+import os
+import sys
+
+import boto3
+import league_logic
+import work_ledger
+from dotenv import load_dotenv
+from riot_client import RiotClient
+
+# Loads every game the friends played since a date (default: the
+# "backfill_since" setting), not just their latest match_count.
+# Usage, from backend/:  python backfill.py [YYYY-MM-DD]
+# An interrupted backfill continues where it stopped when run again.
+
+load_dotenv()
+API_KEY = os.getenv("RIOT_API_KEY")
+
+dynamodb = boto3.resource("dynamodb", region_name="us-west-1")
+table = dynamodb.Table("LeagueMatches")
+
+with open("friends_config.json", "r") as f:
+    config = json.load(f)
+with open("friends_puuids.json", "r") as f:
+    friends = json.load(f)
+
+since = sys.argv[1] if len(sys.argv) > 1 else config["settings"]["backfill_since"]
+
+print(f"--- Starting Backfill since {since} ---")
+client = RiotClient(API_KEY, cache_dir=os.getenv("RIOT_CACHE_DIR", ".riot_cache"))
+ledger = work_ledger.FileLedger(
+    os.getenv("BACKFILL_LEDGER_FILE", ".backfill_ledger.json")
+)
+count = league_logic.process_matches(
+    friends, config, client, table, ledger, backfill_since=since
+)
+print(f"--- Backfill Complete: {count} rows saved ---")
@@ -0,0 +1,210 @@
+from decimal import Decimal
+
+# Each leaderboard widget on the dashboard shows the top five
+LEADERBOARD_SIZE = 5
+POSITIONS = ("TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY")
+MULTIKILLS = ("double", "triple", "quadra", "penta")
+# Every attribute index.html and compute_summary read (a fraction of each row)
+DASHBOARD_FIELDS = (
+    "matchId",
+    "puuid",
+    "friendName",
+    "gameDate",
+    "gameEndTimestamp",
+    "metadata.gameEndTimeStamp",
+    "metadata.gameMode",
+    "metadata.win",
+    "metadata.timePlayed",
+    "metadata.teamPosition",
+    "metadata.championName",
+    "combat.kills",
+    "combat.deaths",
+    "combat.assists",
+    "combat.kda",
+    "combat.totalDamageDealtToChampions",
+    "combat.totalTimeSpentDead",
+    "combat.goldEarned",
+    "combat.multikills",
+    "objectives.dragonKills",
+    "objectives.baronKills",
+    "vision_and_social.visionScore",
+    "vision_and_social.pings",
+)
+
+
+def _num(value):
+    """
+    DynamoDB hands numbers back as Decimal; turn them into plain ints/floats.
+    """
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value or 0
+
+
+def _top(stats, key):
+    ranked = sorted(stats, key=lambda entry: entry[key], reverse=True)
+    return ranked[:LEADERBOARD_SIZE]
+
+
+def compute_summary(rows):
+    """
+    Computes every aggregate the dashboard shows from stored match rows (one per
+    friend per match): the summary bar, the five leaderboards, champion
+    collection, monster graveyard, role preference and the four charts.
+    Mirrors the browser-side logic in frontend/index.html so either can render.
+    """
+    seen_matches = set()
+    totals = {
+        "regsMatches": 0,
+        "regsWins": 0,
+        "aramMatches": 0,
+        "aramWins": 0,
+        "totalSeconds": 0,
+        "longestGame": 0,
+    }
+    friends = {}
+    champions = set()
+    graveyard = {"dragons": 0, "barons": 0, "kills": []}
+    positions = {}
+    latest_game_end = 0
+    # matchId -> (gameEndTimeStamp, win, [rows]) for the time-series charts
+    matches = {}
+
+    for row in rows:
+        name = row.get("friendName") or "Unknown"
+        meta = row.get("metadata") or {}
+        combat = row.get("combat") or {}
+        objectives = row.get("objectives") or {}
+        vision = row.get("vision_and_social") or {}
+        match_id = row.get("matchId")
+        game_end = _num(meta.get("gameEndTimeStamp"))
+        latest_game_end = max(latest_game_end, game_end)
+
+        # --- Summary bar: counted once per match ---
+        if match_id not in seen_matches:
+            seen_matches.add(match_id)
+            duration = _num(meta.get("timePlayed"))
+            totals["totalSeconds"] += duration
+            totals["longestGame"] = max(totals["longestGame"], duration)
+            if meta.get("gameMode") == "CLASSIC":
+                totals["regsMatches"] += 1
+                totals["regsWins"] += 1 if meta.get("win") else 0
+            elif meta.get("gameMode") == "ARAM":
+                totals["aramMatches"] += 1
+                totals["aramWins"] += 1 if meta.get("win") else 0
+            matches[match_id] = (game_end, bool(meta.get("win")), [])
+        matches[match_id][2].append(row)
+
+        # --- Per-friend totals ---
+        friend = friends.setdefault(
+            name,
+            {
+                "name": name,
+                "games": 0,
+                "kills": 0,
+                "damage": 0,
+                "timeDead": 0,
+                "visionScore": 0,
+                "gold": 0,
+                "pings": 0,
+                "pingTypes": {},
+                "multikills": dict.fromkeys(MULTIKILLS, 0),
+            },
+        )
+        friend["games"] += 1
+        friend["kills"] += _num(combat.get("kills"))
+        friend["damage"] += _num(combat.get("totalDamageDealtToChampions"))
+        friend["timeDead"] += _num(combat.get("totalTimeSpentDead"))
+        friend["visionScore"] += _num(vision.get("visionScore"))
+        friend["gold"] += _num(combat.get("goldEarned"))
+        for ping, count in (vision.get("pings") or {}).items():
+            count = _num(count)
+            if count > 0:
+                friend["pings"] += count
+                friend["pingTypes"][ping] = friend["pingTypes"].get(ping, 0) + count
+        multikills = combat.get("multikills") or {}
+        for kind in MULTIKILLS:
+            friend["multikills"][kind] += _num(multikills.get(kind))
+
+        # --- Champion collection ---
+        if meta.get("championName"):
+            champions.add(meta["championName"])
+
+        # --- Monster graveyard ---
+        dragons = _num(objectives.get("dragonKills"))
+        barons = _num(objectives.get("baronKills"))
+        if dragons or barons:
+            graveyard["dragons"] += dragons
+            graveyard["barons"] += barons
+            graveyard["kills"].append(
+                {
+                    "friendName": name,
+                    "championName": meta.get("championName") or "Unknown",
+                    "teamPosition": meta.get("teamPosition") or "Unknown",
+                    "dragons": dragons,
+                    "barons": barons,
+                }
+            )
+
+        # --- Role preference (Summoner's Rift only) ---
+        if meta.get("gameMode") == "CLASSIC":
+            counts = positions.setdefault(name, dict.fromkeys(POSITIONS, 0))
+            if meta.get("teamPosition") in counts:
+                counts[meta["teamPosition"]] += 1
+
+    friend_list = list(friends.values())
+    return {
+        "latestGameEnd": latest_game_end,
+        "totals": totals,
+        "leaderboards": {
+            "kills": _top(friend_list, "kills"),
+            "damage": _top(friend_list, "damage"),
+            "timeDead": _top(friend_list, "timeDead"),
+            "vision": _top(friend_list, "visionScore"),
+            "pings": _top(friend_list, "pings"),
+        },
+        "championsPlayed": sorted(champions),
+        "graveyard": graveyard,
+        "positions": positions,
+        "charts": _charts(matches, friend_list),
+    }
+
+
+def _charts(matches, friend_list):
+    """
+    Win-rate and cumulative-gold series over unique matches in chronological
+    order, plus the damage/kill share scatter and multikill breakdown.
+    """
+    names = [friend["name"] for friend in friend_list]
+    ordered = sorted(matches.values(), key=lambda match: match[0])
+
+    win_rate = []
+    wins = 0
+    gold_series = {name: [] for name in names}
+    running_gold = dict.fromkeys(names, 0)
+    for index, (_, win, rows) in enumerate(ordered, start=1):
+        wins += 1 if win else 0
+        win_rate.append(wins / index * 100)
+        for row in rows:
+            combat = row.get("combat") or {}
+            running_gold[row.get("friendName") or "Unknown"] += _num(
+                combat.get("goldEarned")
+            )
+        for name in names:
+            gold_series[name].append(running_gold[name])
+
+    total_damage = sum(friend["damage"] for friend in friend_list) or 1
+    total_kills = sum(friend["kills"] for friend in friend_list) or 1
+    return {
+        "winRate": win_rate,
+        "gold": gold_series,
+        "scatter": [
+            {
+                "name": friend["name"],
+                "damageShare": friend["damage"] / total_damage * 100,
+                "killShare": friend["kills"] / total_kills * 100,
+            }
+            for friend in friend_list
+        ],
+        "multikills": {friend["name"]: friend["multikills"] for friend in friend_list},
+    }
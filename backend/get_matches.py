@@ -1,14 +1,293 @@
+import base64
+import datetime
+import functools
+import gzip
+import hashlib
 import json
 import os
+import re
+import time
+from decimal import Decimal
 
 import boto3
-from boto3.dynamodb.conditions import Attr
+import dashboard_stats
+import match_store
+
+try:
+    import brotli  # Optional: only used if packaged with the Lambda
+except ImportError:
+    brotli = None
 
 # Initialize DynamoDB client
 dynamodb = boto3.resource("dynamodb")
 table_name = os.environ["TABLE_NAME"]
 table = dynamodb.Table(table_name)
 
+# GSI: partition key gameMonth ("YYYY-MM"), sort key gameEndTimestamp (ms)
+INDEX_NAME = os.environ.get("MATCH_INDEX_NAME", "ByMonth")
+# GSI: partition key savedMonth ("YYYY-MM"), sort key savedAt (ms); delta sync
+SAVED_INDEX_NAME = os.environ.get("SAVED_INDEX_NAME", "BySaved")
+# A delta cursor stays this far behind now, so rows stamped before a query but
+# written after it (a poll still running) are sent again rather than skipped
+DELTA_SETTLE_MS = int(os.environ.get("DELTA_SETTLE_SECONDS", "120")) * 1000
+# Warm containers reuse a built response until the poller bumps the dataset
+# version or this many seconds pass (a backstop for missed bumps)
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", "900"))
+# How long browsers may reuse a response before revalidating with If-None-Match
+CLIENT_MAX_AGE = int(os.environ.get("CLIENT_MAX_AGE", "60"))
+
+# Compression levels: the encoded body is cached per dataset version, so it is
+# built at most once per poll and can afford more than the fastest setting
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 6
+
+# Named field sets for ?fields=
+FIELD_PRESETS = {"dashboard": dashboard_stats.DASHBOARD_FIELDS}
+# ?limit= page size bounds; pages keep bodies far below the 6 MB Lambda payload cap
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+# Always projected: row identity, game end and write time
+KEY_FIELDS = ("matchId", "puuid", "gameEndTimestamp", "savedAt")
+# A page cursor's ExclusiveStartKey: table key plus ByMonth index key
+CURSOR_KEY_FIELDS = ("matchId", "puuid", "gameMonth", "gameEndTimestamp")
+_CURSOR_MONTH = re.compile(r"\d{4}-(0[1-9]|1[0-2])")
+_FIELD_PATH = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*")
+
+# {cache key: {"body", "hash", "version", "expires", "encoded"}}, kept across
+# warm invocations; "encoded" holds base64 bodies per content-encoding
+response_cache = {}
+
+
+def parse_fields(value):
+    """
+    Expands a ?fields= value (comma-separated attribute paths and/or preset
+    names) into a sorted tuple of paths, or None for whole items. Paths under
+    another requested path are dropped, since DynamoDB rejects projections
+    with overlapping paths.
+    Raises ValueError on anything that isn't a plain attribute path.
+    """
+    if not value:
+        return None
+    fields = set(KEY_FIELDS)
+    for token in value.split(","):
+        token = token.strip()
+        if token in FIELD_PRESETS:
+            fields.update(FIELD_PRESETS[token])
+        elif _FIELD_PATH.fullmatch(token):
+            fields.add(token)
+        else:
+            raise ValueError(f"bad field {token!r}")
+    return tuple(
+        sorted(
+            field
+            for field in fields
+            if not any(field.startswith(f"{other}.") for other in fields)
+        )
+    )
+
+
+def query_items(min_date, fields=None):
+    print(f"DEBUG: Querying {table_name}/{INDEX_NAME} from {min_date}")
+    items = match_store.load_rows(table, INDEX_NAME, min_date, fields)
+    print(f"DEBUG: Query complete. Found {len(items)} items.")
+    return items
+
+
+def sync_cursor(since=0, items=()):
+    """
+    The `since` a client sends next: the newest write it was given, but never
+    within DELTA_SETTLE_MS of now, and never behind the one it sent.
+    """
+    newest = max([int(item["savedAt"]) for item in items] + [since])
+    settled = int(time.time() * 1000) - DELTA_SETTLE_MS
+    return max(since, min(newest, settled))
+
+
+def build_body(min_date, fields=None):
+    items = query_items(min_date, fields=fields)
+    return json.dumps(items, default=str)  # default=str handles Decimal types
+
+
+def build_delta(min_date, since, fields=None):
+    """
+    Rows written after `since` (savedAt, ms), whatever their game's end time,
+    plus the cursor the client sends as `since` next time.
+    """
+    print(f"DEBUG: Querying {table_name}/{SAVED_INDEX_NAME} since={since}")
+    items = match_store.load_saved_rows(
+        table, SAVED_INDEX_NAME, min_date, since, fields
+    )
+    print(f"DEBUG: Query complete. Found {len(items)} items.")
+    cursor = sync_cursor(since, items)
+    return json.dumps({"items": items, "since": cursor}, default=str)
+
+
+def encode_cursor(month, start_key):
+    """
+    Opaque page cursor: the month bucket to resume in and the index
+    ExclusiveStartKey within it (None to start at the bucket's newest game).
+    """
+    if start_key is not None:
+        start_key = {
+            k: int(v) if isinstance(v, Decimal) else v for k, v in start_key.items()
+        }
+    state = json.dumps({"month": month, "key": start_key}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(state.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """
+    Returns (month, start_key) from a cursor made by encode_cursor.
+    Raises ValueError on anything else, including well-formed JSON whose month
+    or key DynamoDB would reject.
+    """
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        month, start_key = state["month"], state["key"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("bad cursor") from None
+    if not isinstance(month, str) or not _CURSOR_MONTH.fullmatch(month):
+        raise ValueError("bad cursor")
+    if start_key is not None and not _valid_start_key(start_key, month):
+        raise ValueError("bad cursor")
+    return month, start_key
+
+
+def _valid_start_key(start_key, month):
+    # Exactly the ByMonth index key plus the table key, typed as stored
+    return (
+        isinstance(start_key, dict)
+        and set(start_key) == set(CURSOR_KEY_FIELDS)
+        and isinstance(start_key["matchId"], str)
+        and isinstance(start_key["puuid"], str)
+        and start_key["gameMonth"] == month
+        and isinstance(start_key["gameEndTimestamp"], int)
+        and not isinstance(start_key["gameEndTimestamp"], bool)
+    )
+
+
+def build_page(min_date, limit, cursor=None, fields=None):
+    """
+    One page of rows, newest first, and the cursor for the next (older) page,
+    or null once the history is exhausted. Pages walk the month buckets in
+    order, resuming each Query from its LastEvaluatedKey. `since` is where the
+    client's delta sync starts, so rows written while it pages aren't missed.
+    """
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    months = match_store.months_between(min_date, today)
+    start_key = None
+    if cursor:
+        month, start_key = decode_cursor(cursor)
+        months = [m for m in months if m <= month]
+
+    items = []
+    next_cursor = None
+    for index, month in enumerate(months):
+        kwargs = match_store.month_query(INDEX_NAME, month, min_date, fields=fields)
+        while len(items) < limit:
+            kwargs["Limit"] = limit - len(items)
+            if start_key:
+                kwargs["ExclusiveStartKey"] = start_key
+            response = table.query(**kwargs)
+            items.extend(response.get("Items", []))
+            start_key = response.get("LastEvaluatedKey")
+            if not start_key:
+                break
+
+        if start_key:
+            next_cursor = encode_cursor(month, start_key)
+            break
+        if len(items) >= limit:
+            if index + 1 < len(months):
+                next_cursor = encode_cursor(months[index + 1], None)
+            break
+
+    print(f"DEBUG: Page of {len(items)} items, more: {next_cursor is not None}")
+    return json.dumps(
+        {"items": items, "cursor": next_cursor, "since": sync_cursor()}, default=str
+    )
+
+
+def build_summary(min_date):
+    """
+    Aggregates for the dashboard widgets, so browsers don't need every row.
+    """
+    items = query_items(min_date, fields=parse_fields("dashboard"))
+    summary = dashboard_stats.compute_summary(items)
+    return json.dumps(summary)
+
+
+# Request path -> body builder; both share caching, ETags and compression
+ROUTES = {"/matches": build_body, "/summary": build_summary}
+
+
+def choose_encoding(accept_encoding):
+    """
+    Picks the best content-encoding the client accepts: br, then gzip, else
+    None (identity). Codings with q=0 are treated as refused.
+    """
+    accepted = set()
+    for part in (accept_encoding or "").lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip())
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def entity_tag(entry, encoding):
+    """
+    Each representation (identity, gzip, br) gets its own strong validator.
+    """
+    if encoding is None:
+        return f'"{entry["hash"]}"'
+    return f'"{entry["hash"]}-{encoding}"'
+
+
+def encode_body(entry, encoding):
+    """
+    Returns the base64 body for `encoding`, compressing once per cache entry.
+    """
+    if encoding not in entry["encoded"]:
+        raw = entry["body"].encode("utf-8")
+        if encoding == "br":
+            packed = brotli.compress(raw, quality=BROTLI_QUALITY)
+        else:
+            packed = gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+        entry["encoded"][encoding] = base64.b64encode(packed).decode("ascii")
+        print(f"DEBUG: {encoding} body: {len(raw)} -> {len(packed)} bytes")
+    return entry["encoded"][encoding]
+
+
+def cached_response(cache_key, version, build):
+    """
+    Returns the cache entry for cache_key, rebuilding it with build() when the
+    dataset version moved on or the entry expired.
+    """
+    entry = response_cache.get(cache_key)
+    if entry and entry["version"] == version and entry["expires"] > time.time():
+        print(f"DEBUG: Serving cached response (dataset version {version})")
+        return entry
+
+    # Drop entries from older dataset versions so per-cursor keys don't pile up
+    for key in [k for k, e in response_cache.items() if e["version"] != version]:
+        del response_cache[key]
+
+    body = build()
+    entry = {
+        "body": body,
+        "hash": hashlib.sha256(body.encode("utf-8")).hexdigest()[:32],
+        "version": version,
+        "expires": time.time() + RESPONSE_CACHE_TTL,
+        "encoded": {},
+    }
+    response_cache[cache_key] = entry
+    return entry
+
 
 def lambda_handler(event, context):
     print("DEBUG: Starting get_matches lambda_handler")
@@ -17,18 +296,66 @@ def lambda_handler(event, context):
         min_date = os.environ.get("MIN_GAME_DATE", "2026-01-01")
         print(f"DEBUG: Using MIN_GAME_DATE: {min_date}")
 
-        # This simple version scans the whole table (ok for small datasets).
-        print(f"DEBUG: Scanning table: {table_name}")
-        response = table.scan(FilterExpression=Attr("gameDate").gte(min_date))
-        items = response.get("Items", [])
-        print(f"DEBUG: Scan complete. Found {len(items)} items.")
+        # HTTP API routeKey looks like "GET /summary"
+        path = (event or {}).get("routeKey", "GET /matches").split(" ")[-1]
+        build = ROUTES.get(path, build_body)
+        print(f"DEBUG: Serving {path}")
+
+        params = (event or {}).get("queryStringParameters") or {}
+        cache_key = f"{path}?{min_date}"
+        if path == "/matches":
+            try:
+                fields = parse_fields(params.get("fields"))
+                since = int(params["since"]) if params.get("since") else None
+                paged = "limit" in params or "cursor" in params
+                limit = int(params.get("limit") or DEFAULT_PAGE_SIZE)
+                if paged and not 1 <= limit <= MAX_PAGE_SIZE:
+                    raise ValueError(f"limit must be 1-{MAX_PAGE_SIZE}")
+                cursor = params.get("cursor")
+                if cursor:
+                    decode_cursor(cursor)
+            except ValueError as e:
+                return {"statusCode": 400, "body": json.dumps(f"Error: {e}")}
+            if fields:
+                cache_key = f"{cache_key}&fields={','.join(fields)}"
+                build = functools.partial(build_body, fields=fields)
+            if paged:
+                cache_key = f"{cache_key}&limit={limit}&cursor={cursor or ''}"
+                build = functools.partial(
+                    build_page, limit=limit, cursor=cursor, fields=fields
+                )
+            # Deltas are small by nature, so since takes precedence over paging
+            if since is not None:
+                cache_key = f"{cache_key}&since={since}"
+                build = functools.partial(build_delta, since=since, fields=fields)
+
+        version = match_store.get_dataset_version(table)
+        entry = cached_response(cache_key, version, lambda: build(min_date))
+
+        # HTTP API (payload v2) lower-cases header names
+        request_headers = (event or {}).get("headers") or {}
+        encoding = choose_encoding(request_headers.get("accept-encoding"))
+        etag = entity_tag(entry, encoding)
+
+        headers = {
+            "Content-Type": "application/json",
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={CLIENT_MAX_AGE}, must-revalidate",
+            "Vary": "Accept-Encoding",
+        }
+        if etag in request_headers.get("if-none-match", ""):
+            print("DEBUG: ETag matched, returning 304")
+            return {"statusCode": 304, "headers": headers, "body": ""}
 
-        # Sort items by match end time if available, or handle in frontend
-        items.sort(key=lambda x: x.get("gameEndTimestamp", 0), reverse=True)
+        if encoding is None:
+            return {"statusCode": 200, "headers": headers, "body": entry["body"]}
 
+        headers["Content-Encoding"] = encoding
         return {
             "statusCode": 200,
-            "body": json.dumps(items, default=str),  # default=str handles Decimal types
+            "headers": headers,
+            "body": encode_body(entry, encoding),
+            "isBase64Encoded": True,
         }
 
     except Exception as e:
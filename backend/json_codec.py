@@ -0,0 +1,86 @@
+import json
+import threading
+import time
+
+
+class StdlibCodec:
+    """
+    Decodes UTF-8 JSON bytes with the stdlib parser (always available).
+    """
+
+    name = "json"
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    """
+    Decodes JSON bytes with orjson, which parses bytes directly in Rust.
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self.loads = orjson.loads
+
+
+CODECS = {"json": StdlibCodec, "orjson": OrjsonCodec}
+
+
+def get_codec(name=None):
+    """
+    Returns the named codec, or the fastest importable one when name is None.
+    """
+    if name:
+        return CODECS[name]()
+    try:
+        return OrjsonCodec()
+    except ImportError:
+        return StdlibCodec()
+
+
+class ParseStats:
+    """
+    Thread-safe counters of JSON decode cost per endpoint (Riot method name).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, method, nbytes, seconds):
+        with self._lock:
+            entry = self._stats.setdefault(
+                method, {"calls": 0, "bytes": 0, "seconds": 0.0}
+            )
+            entry["calls"] += 1
+            entry["bytes"] += nbytes
+            entry["seconds"] += seconds
+
+    def timed(self, method, loads, data):
+        """
+        Decodes `data` with `loads`, recording the time spent.
+        """
+        start = time.perf_counter()
+        try:
+            return loads(data)
+        finally:
+            self.record(method, len(data), time.perf_counter() - start)
+
+    def snapshot(self):
+        with self._lock:
+            return {method: dict(entry) for method, entry in self._stats.items()}
+
+    def report(self, codec_name):
+        for method, entry in sorted(self.snapshot().items()):
+            print(
+                f"DEBUG: JSON parse [{codec_name}] {method}: {entry['calls']} calls, "
+                f"{entry['bytes'] / 1024:.1f} KB, {entry['seconds'] * 1000:.1f} ms"
+            )
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
@@ -1,9 +1,39 @@
 import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import boto3
 import league_logic  # Import league logic
+import snapshot
+import work_ledger
 from botocore.exceptions import ClientError
+from riot_client import Deadline, RiotClient
+
+# Seconds a fetched Riot API key is reused across warm invocations
+SECRET_CACHE_TTL = int(os.environ.get("SECRET_CACHE_TTL", "3600"))
+
+# Created once per container; reused by every secret fetch
+secrets_client = None
+# {"value": key, "expires": epoch seconds}, kept across warm invocations
+secret_cache = {"value": None, "expires": 0.0}
+secret_lock = threading.Lock()
+
+
+def get_secrets_client(region_name):
+    global secrets_client
+    if secrets_client is None:
+        try:
+            session = boto3.session.Session()
+            secrets_client = session.client(
+                service_name="secretsmanager", region_name=region_name
+            )
+            print("DEBUG: Boto3 Secrets Manager client created successfully.")
+        except Exception as e:
+            print(f"CRITICAL ERROR: Failed to create Boto3 client. Details: {e}")
+            raise e
+    return secrets_client
 
 
 def get_secrets():
@@ -26,14 +56,8 @@ def get_secrets():
         # This prevents the specific error you just saw by failing early with a clear message
         raise ValueError("Missing SECRET_NAME environment variable")
 
-    # 2. Create Client
-    try:
-        session = boto3.session.Session()
-        client = session.client(service_name="secretsmanager", region_name=region_name)
-        print("DEBUG: Boto3 Secrets Manager client created successfully.")
-    except Exception as e:
-        print(f"CRITICAL ERROR: Failed to create Boto3 client. Details: {e}")
-        raise e
+    # 2. Reuse the container's client
+    client = get_secrets_client(region_name)
 
     # 3. Fetch Secret
     try:
@@ -72,10 +96,58 @@ def get_secrets():
     return secret_dict["RIOT_API_KEY"]
 
 
+def get_riot_api_key(force_refresh=False):
+    """
+    Returns the Riot API key, fetching it from Secrets Manager only when the
+    cached copy is older than SECRET_CACHE_TTL or force_refresh is set
+    (e.g. Riot rejected the cached key).
+    """
+    with secret_lock:
+        if (
+            not force_refresh
+            and secret_cache["value"]
+            and secret_cache["expires"] > time.time()
+        ):
+            return secret_cache["value"]
+        secret_cache["value"] = get_secrets()
+        secret_cache["expires"] = time.time() + SECRET_CACHE_TTL
+        return secret_cache["value"]
+
+
 #  Setup AWS Environment
-dynamodb = boto3.resource("dynamodb")
 TABLE_NAME = os.environ.get("TABLE_NAME", "LeagueMatches")
-table = dynamodb.Table(TABLE_NAME)
+INDEX_NAME = os.environ.get("MATCH_INDEX_NAME", "ByMonth")
+MIN_GAME_DATE = os.environ.get("MIN_GAME_DATE", "2026-01-01")
+
+# Per-container state, set up by initialize() on the first invocation
+table = None
+# Work left by a run that hit its deadline, picked up by the next one
+ledger = None
+backfill_ledger = None
+# Static dashboard snapshots (S3 frontend bucket); None when not configured
+publisher = None
+config = None
+friends = None
+initialized = False
+
+# Riot API client lives at module scope so warm invocations reuse its connections
+riot_client = None
+
+
+def get_riot_client(api_key):
+    global riot_client
+    if riot_client is None:
+        print("DEBUG: Creating pooled Riot API client.")
+        # Finished match payloads are cached in /tmp and survive warm invocations
+        riot_client = RiotClient(
+            api_key,
+            cache_dir=os.environ.get("RIOT_CACHE_DIR"),
+            cache_max_bytes=int(os.environ.get("RIOT_CACHE_MAX_MB", "256")) << 20,
+            refresh_api_key=lambda: get_riot_api_key(force_refresh=True),
+        )
+    elif riot_client.api_key != api_key:
+        riot_client.set_api_key(api_key)
+    return riot_client
 
 
 def load_json(filename):
@@ -83,17 +155,107 @@ def load_json(filename):
         return json.load(f)
 
 
-def lambda_handler(event, context):
-    print("--- STARTING LAMBDA RUN ---")
-    riot_api_key = get_secrets()
-
+def load_configs():
+    global config, friends
     # Load Config (Packaged in the zip)
     config = load_json("friends_config.json")
     friends = load_json("friends_puuids.json")
     print(f"DEBUG: Loaded {len(friends)} friends and config settings.")
+    return config
+
+
+def setup_table():
+    global table, ledger, backfill_ledger
+    # Own session: boto3's default session isn't safe to share across threads
+    dynamodb = boto3.session.Session().resource("dynamodb")
+    table = dynamodb.Table(TABLE_NAME)
+    ledger = work_ledger.DynamoLedger(table)
+    backfill_ledger = work_ledger.DynamoLedger(table, job="backfill")
+
+
+def setup_publisher():
+    global publisher
+    publisher = snapshot.get_publisher()
+
+
+def prewarm_riot(config_future):
+    """
+    Creates the Riot client (key set later) and opens its first connection
+    while the secret is still being fetched.
+    """
+    region = config_future.result()["settings"]["region"]
+    try:
+        get_riot_client(None).prewarm(region)
+    except Exception as e:
+        # Only an optimisation: the first real request will connect instead
+        print(f"DEBUG: Riot pre-warm failed: {e}")
+
+
+def timed_phase(timings, name, func, *args):
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        timings[name] = time.perf_counter() - start
+
+
+def initialize():
+    """
+    Runs the independent cold-start steps concurrently: Secrets Manager fetch,
+    config loads, Riot TLS pre-warm and AWS client setup. Warm invocations
+    only revalidate the cached secret. Prints per-phase timings.
+    """
+    global initialized
+    timings = {}
+    start = time.perf_counter()
+    if initialized:
+        timed_phase(timings, "secrets", get_riot_api_key)
+    else:
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            config_future = pool.submit(timed_phase, timings, "config", load_configs)
+            phases = [
+                pool.submit(timed_phase, timings, "secrets", get_riot_api_key),
+                pool.submit(
+                    timed_phase, timings, "riot_tls", prewarm_riot, config_future
+                ),
+                pool.submit(timed_phase, timings, "dynamodb", setup_table),
+                pool.submit(timed_phase, timings, "snapshot", setup_publisher),
+                config_future,
+            ]
+            for future in phases:
+                future.result()  # re-raise any failure
+        initialized = True
+
+    report = ", ".join(f"{name} {secs * 1000:.0f} ms" for name, secs in timings.items())
+    total_ms = (time.perf_counter() - start) * 1000
+    print(f"DEBUG: Init phases: {report} (total {total_ms:.0f} ms)")
+
+
+def lambda_handler(event, context):
+    print("--- STARTING LAMBDA RUN ---")
+    initialize()
+
+    # Run the Shared Logic, stopping Riot work before the Lambda timeout
+    client = get_riot_client(get_riot_api_key())
+    client.set_deadline(Deadline.from_context(context) if context else None)
+    # {"backfill_since": "YYYY-MM-DD"} loads history instead of the latest games.
+    # Each invocation continues from the backfill ledger; the backfill is done
+    # once its #ledger item has been deleted
+    backfill_since = (event or {}).get("backfill_since")
+    if backfill_since:
+        count = league_logic.process_matches(
+            friends, config, client, table, backfill_ledger, backfill_since
+        )
+    else:
+        count = league_logic.process_matches(friends, config, client, table, ledger)
 
-    # Run the Shared Logic
-    count = league_logic.process_matches(friends, config, riot_api_key, table)
+    if publisher is not None:
+        try:
+            snapshot.publish_snapshot(publisher, table, INDEX_NAME, MIN_GAME_DATE)
+        except Exception as e:
+            # The saved rows stand; the next run sees the stale version and
+            # publishes again
+            print(f"DEBUG: Failed to publish snapshot: {e}")
 
     return {
         "statusCode": 200,
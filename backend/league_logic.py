@@ -1,177 +1,723 @@
 import datetime
-import json
-from decimal import Decimal
-from zoneinfo import ZoneInfo
+import itertools
+import threading
+import time
 
-import requests
+import match_store
+import match_stream
+import pipeline
+import work_ledger
+from riot_client import CACHE_FOREVER, DeadlineExceeded
 
+# Match-ID lists change as games finish, so cached copies only live briefly
+MATCH_IDS_CACHE_TTL = 120
+# Most IDs match-v5 returns per ids request
+BACKFILL_PAGE_SIZE = 100
+# Runs that may fail to save a match before it is parked (setting
+# max_match_attempts)
+MAX_MATCH_ATTEMPTS = 3
 
-def get_match_ids(puuid, routing_region, count, api_key):
+
+def get_match_ids(
+    puuid, routing_region, count, client, start_time=None, end_time=None, start=0
+):
     """
-    Fetches a list of Match IDs for a specific player.
+    Fetches a list of Match IDs for a specific player, or None on failure.
+    start_time/end_time (epoch seconds) limit the list to games in that window;
+    start skips that many IDs (for paging past `count`).
     """
-    url = f"https://{routing_region}.api.riotgames.com/lol/match/v5/matches/by-puuid/{puuid}/ids"
+    path = f"/lol/match/v5/matches/by-puuid/{puuid}/ids"
     params = {"count": count}
-    headers = {"X-Riot-Token": api_key}
-    print(f"DEBUG: Fetching match IDs from {url}")
+    if start:
+        params["start"] = start
+    if start_time:
+        params["startTime"] = start_time
+    if end_time:
+        params["endTime"] = end_time
+    print(f"DEBUG: Fetching match IDs from {routing_region} {path}")
 
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = client.get(
+            routing_region,
+            path,
+            params=params,
+            method="match-v5.matchIds",
+            cache_ttl=MATCH_IDS_CACHE_TTL,
+        )
         if response.status_code == 200:
-            ids = response.json()
+            ids = client.decode_json(response, "match-v5.matchIds")
             print(f"DEBUG: Found {len(ids)} matches.")
             return ids
         print(
             f"DEBUG: Failed to fetch matches. Status: {response.status_code} Body: {response.text}"
         )
-        return []
+        return None
     except Exception as e:
         print(f"Request failed: {e}")
-        return []
+        return None
 
 
-def get_match_details(match_id, routing_region, target_puuid, api_key, friend_name):
+def backfill_windows(since_date, window_days, now=None):
     """
-    Fetches the deep details of a match and extracts the stats for ONE player.
+    Splits the time from since_date ("YYYY-MM-DD", UTC midnight) to now into
+    window_days-long (startTime, endTime) windows in epoch seconds, newest
+    first. Windows are anchored at since_date, so their start times stay the
+    same from one run to the next and can be recorded as done.
     """
-    url = f"https://{routing_region}.api.riotgames.com/lol/match/v5/matches/{match_id}"
-    headers = {"X-Riot-Token": api_key}
-    print(f"DEBUG: Fetching details for match {match_id}...")
+    start = int(
+        datetime.datetime.strptime(since_date, "%Y-%m-%d")
+        .replace(tzinfo=datetime.timezone.utc)
+        .timestamp()
+    )
+    end = int(now if now is not None else time.time())
+    step = window_days * 86400
+    windows = [(t, min(t + step, end)) for t in range(start, end, step)]
+    return windows[::-1]
 
-    try:
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            print(f"Failed to get details for {match_id}: {response.status_code}")
+
+def list_match_window(puuid, routing_region, client, start_time, end_time):
+    """
+    Pages through every match ID a player has in one time window,
+    BACKFILL_PAGE_SIZE at a time. Returns None if any page failed.
+    """
+    ids = []
+    while True:
+        page = get_match_ids(
+            puuid,
+            routing_region,
+            BACKFILL_PAGE_SIZE,
+            client,
+            start_time,
+            end_time,
+            start=len(ids),
+        )
+        if page is None:
             return None
-        data = response.json()
-    except Exception as e:
-        print(f"Error parsing match {match_id}: {e}")
-        return None
+        ids.extend(page)
+        if len(page) < BACKFILL_PAGE_SIZE:
+            return ids
+
+
+# Every participant field extract_player_stats reads; the streaming path decodes
+# only these from the match-v5 document
+PARTICIPANT_FIELDS = (
+    "puuid",
+    "timePlayed",
+    "gameEndedInSurrender",
+    "teamPosition",
+    "championName",
+    "win",
+    "kills",
+    "deaths",
+    "assists",
+    "goldEarned",
+    "firstBloodKill",
+    "largestCriticalStrike",
+    "totalDamageDealtToChampions",
+    "totalDamageTaken",
+    "totalTimeSpentDead",
+    "timeCCingOthers",
+    "doubleKills",
+    "tripleKills",
+    "quadraKills",
+    "pentaKills",
+    "damageDealtToTurrets",
+    "damageDealtToBuildings",
+    "damageDealtToObjectives",
+    "baronKills",
+    "dragonKills",
+    "objectivesStolen",
+    "objectivesStolenAssists",
+    "totalEnemyJungleMinionsKilled",
+    "totalAllyJungleMinionsKilled",
+    "visionScore",
+    "wardsPlaced",
+    "wardsKilled",
+    "sightWardsBoughtInGame",
+    "assistMePings",
+    "commandPings",
+    "enemyMissingPings",
+    "enemyVisionPings",
+    "holdPings",
+    "getBackPings",
+    "needVisionPings",
+    "onMyWayPings",
+    "visionClearedPings",
+)
+
 
+def extract_player_stats(match_id, info, p, friend_name, game_date_str):
+    """
+    Builds the stored stats row for ONE participant of an already-fetched match.
+    """
+    return {
+        # --- DYNAMODB KEYS  ---
+        "matchId": match_id,
+        "puuid": p["puuid"],
+        "friendName": friend_name,
+        # --- GAME DATE FOR EASY FILTERING ---
+        "gameDate": game_date_str,
+        # --- ByMonth INDEX KEYS (partition by month, sort by end time) ---
+        "gameMonth": game_date_str[:7],
+        "gameEndTimestamp": info.get("gameEndTimestamp", 0),
+        # --- METADATA ---
+        "metadata": {
+            "gameMode": info.get("gameMode", "UNKNOWN"),
+            "timePlayed": p.get("timePlayed", 0),
+            "gameEndedInSurrender": p.get("gameEndedInSurrender", False),
+            "teamPosition": p.get("teamPosition", "UNKNOWN"),
+            "championName": p.get("championName", "Unknown"),
+            "gameEndTimeStamp": info.get("gameEndTimestamp", 0),
+            "win": p.get("win", False),
+        },
+        # --- COMBAT STATS ---
+        "combat": {
+            "kills": p.get("kills", 0),
+            "deaths": p.get("deaths", 0),
+            "assists": p.get("assists", 0),
+            "kda": round(
+                (p.get("kills", 0) + p.get("assists", 0)) / max(1, p.get("deaths", 1)),
+                2,
+            ),
+            "goldEarned": p.get("goldEarned", 0),
+            "firstBloodKill": p.get("firstBloodKill", False),
+            "largestCriticalStrike": p.get("largestCriticalStrike", 0),
+            "totalDamageDealtToChampions": p.get("totalDamageDealtToChampions", 0),
+            "totalDamageTaken": p.get("totalDamageTaken", 0),
+            "totalTimeSpentDead": p.get("totalTimeSpentDead", 0),
+            "timeCCingOthers": p.get("timeCCingOthers", 0),
+            "multikills": {
+                "double": p.get("doubleKills", 0),
+                "triple": p.get("tripleKills", 0),
+                "quadra": p.get("quadraKills", 0),
+                "penta": p.get("pentaKills", 0),
+            },
+        },
+        # --- OBJECTIVE STATS ---
+        "objectives": {
+            "damageToTurrets": p.get("damageDealtToTurrets", 0),
+            "damageToBuildings": p.get("damageDealtToBuildings", 0),
+            "damageToObjectives": p.get("damageDealtToObjectives", 0),
+            "baronKills": p.get("baronKills", 0),
+            "dragonKills": p.get("dragonKills", 0),
+            "objectivesStolen": p.get("objectivesStolen", 0),
+            "objectivesStolenAssists": p.get("objectivesStolenAssists", 0),
+            "enemyJungleCS": p.get("totalEnemyJungleMinionsKilled", 0),
+            "allyJungleCS": p.get("totalAllyJungleMinionsKilled", 0),
+        },
+        # --- VISION & SOCIAL STATS ---
+        "vision_and_social": {
+            "visionScore": p.get("visionScore", 0),
+            "wardsPlaced": p.get("wardsPlaced", 0),
+            "wardsKilled": p.get("wardsKilled", 0),
+            "sightWardsBought": p.get("sightWardsBoughtInGame", 0),
+            "pings": {
+                "assistMe": p.get("assistMePings", 0),
+                "command": p.get("commandPings", 0),
+                "enemyMissing": p.get("enemyMissingPings", 0),
+                "enemyVision": p.get("enemyVisionPings", 0),
+                "hold": p.get("holdPings", 0),
+                "getBack": p.get("getBackPings", 0),
+                "needVision": p.get("needVisionPings", 0),
+                "onMyWay": p.get("onMyWayPings", 0),
+                "visionCleared": p.get("visionClearedPings", 0),
+            },
+        },
+    }
+
+
+def extract_match_stats(match_id, data, tracked_puuids):
+    """
+    Walks the participants of a match ONCE and returns a stats row for every
+    tracked player found in it.
+    tracked_puuids maps puuid -> friend name.
+    """
     # Safely access the info block
     info = data.get("info", {})
     participants = info.get("participants", [])
 
+    from zoneinfo import ZoneInfo  # Deferred: loads tzdata, only needed here
+
     creation_ms = info.get("gameCreation", 0)
     dt_utc = datetime.datetime.fromtimestamp(creation_ms / 1000, datetime.timezone.utc)
     game_date_str = dt_utc.astimezone(ZoneInfo("US/Pacific")).strftime("%Y-%m-%d")
 
+    rows = []
     for p in participants:
-        if p["puuid"] == target_puuid:
-
-            return {
-                # --- DYNAMODB KEYS  ---
-                "matchId": match_id,
-                "puuid": target_puuid,
-                "friendName": friend_name,
-                # --- GAME DATE FOR EASY FILTERING ---
-                "gameDate": game_date_str,
-                # --- METADATA ---
-                "metadata": {
-                    "gameMode": info.get("gameMode", "UNKNOWN"),
-                    "timePlayed": p.get("timePlayed", 0),
-                    "gameEndedInSurrender": p.get("gameEndedInSurrender", False),
-                    "teamPosition": p.get("teamPosition", "UNKNOWN"),
-                    "championName": p.get("championName", "Unknown"),
-                    "gameEndTimeStamp": info.get("gameEndTimestamp", 0),
-                    "win": p.get("win", False),
-                },
-                # --- COMBAT STATS ---
-                "combat": {
-                    "kills": p.get("kills", 0),
-                    "deaths": p.get("deaths", 0),
-                    "assists": p.get("assists", 0),
-                    "kda": round(
-                        (p.get("kills", 0) + p.get("assists", 0))
-                        / max(1, p.get("deaths", 1)),
-                        2,
-                    ),
-                    "goldEarned": p.get("goldEarned", 0),
-                    "firstBloodKill": p.get("firstBloodKill", False),
-                    "largestCriticalStrike": p.get("largestCriticalStrike", 0),
-                    "totalDamageDealtToChampions": p.get(
-                        "totalDamageDealtToChampions", 0
-                    ),
-                    "totalDamageTaken": p.get("totalDamageTaken", 0),
-                    "totalTimeSpentDead": p.get("totalTimeSpentDead", 0),
-                    "timeCCingOthers": p.get("timeCCingOthers", 0),
-                    "multikills": {
-                        "double": p.get("doubleKills", 0),
-                        "triple": p.get("tripleKills", 0),
-                        "quadra": p.get("quadraKills", 0),
-                        "penta": p.get("pentaKills", 0),
-                    },
-                },
-                # --- OBJECTIVE STATS ---
-                "objectives": {
-                    "damageToTurrets": p.get("damageDealtToTurrets", 0),
-                    "damageToBuildings": p.get("damageDealtToBuildings", 0),
-                    "damageToObjectives": p.get("damageDealtToObjectives", 0),
-                    "baronKills": p.get("baronKills", 0),
-                    "dragonKills": p.get("dragonKills", 0),
-                    "objectivesStolen": p.get("objectivesStolen", 0),
-                    "objectivesStolenAssists": p.get("objectivesStolenAssists", 0),
-                    "enemyJungleCS": p.get("totalEnemyJungleMinionsKilled", 0),
-                    "allyJungleCS": p.get("totalAllyJungleMinionsKilled", 0),
-                },
-                # --- VISION & SOCIAL STATS ---
-                "vision_and_social": {
-                    "visionScore": p.get("visionScore", 0),
-                    "wardsPlaced": p.get("wardsPlaced", 0),
-                    "wardsKilled": p.get("wardsKilled", 0),
-                    "sightWardsBought": p.get("sightWardsBoughtInGame", 0),
-                    "pings": {
-                        "assistMe": p.get("assistMePings", 0),
-                        "command": p.get("commandPings", 0),
-                        "enemyMissing": p.get("enemyMissingPings", 0),
-                        "enemyVision": p.get("enemyVisionPings", 0),
-                        "hold": p.get("holdPings", 0),
-                        "getBack": p.get("getBackPings", 0),
-                        "needVision": p.get("needVisionPings", 0),
-                        "onMyWay": p.get("onMyWayPings", 0),
-                        "visionCleared": p.get("visionClearedPings", 0),
-                    },
-                },
-            }
-    print(
-        f"DEBUG: Target PUUID {target_puuid} not found in match {match_id} participants."
-    )
-    return None
+        friend_name = tracked_puuids.get(p.get("puuid"))
+        if friend_name is not None:
+            rows.append(
+                extract_player_stats(match_id, info, p, friend_name, game_date_str)
+            )
+    return rows
+
+
+def fetch_match_data(match_id, routing_region, client, tracked_puuids, streaming=True):
+    """
+    Fetches a match and returns its decoded match-v5 document, or None on
+    failure. DeadlineExceeded, raised when the run has no time left for the
+    request, is passed on so callers can tell it from a failed match.
+    With streaming, a live body is read incrementally (and written through to
+    the response cache as it arrives) and only the fields extract_match_stats
+    needs are decoded, so the full match-v5 document is never built in memory
+    (lower peak memory, more CPU than the C json parser). Cache hits are
+    already in memory and go straight to the C parser.
+    """
+    print(f"DEBUG: Fetching details for match {match_id}...")
+
+    try:
+        response = client.get(
+            routing_region,
+            f"/lol/match/v5/matches/{match_id}",
+            method="match-v5.match",
+            cache_ttl=CACHE_FOREVER,
+            stream=streaming,
+        )
+        with response:
+            if response.status_code != 200:
+                print(f"Failed to get details for {match_id}: {response.status_code}")
+                return None
+            if not streaming or response.headers.get("X-Cache") == "HIT":
+                # Already in memory: the C decoder beats scanning the buffer
+                return client.decode_json(response, "match-v5.match")
+            scanner = match_stream.StreamScanner(
+                response.iter_content(match_stream.CHUNK_SIZE), client.codec.loads
+            )
+            start = time.perf_counter()
+            data = match_stream.read_match_subset(
+                scanner, tracked_puuids, PARTICIPANT_FIELDS
+            )
+            # Read to the end so the response cache gets the whole body
+            scanner.drain()
+            # Streamed timings include waiting on the network between chunks
+            client.parse_stats.record(
+                "match-v5.match (streamed)",
+                scanner.bytes_read,
+                time.perf_counter() - start,
+            )
+            return data
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        print(f"Error parsing match {match_id}: {e}")
+        return None
+
+
+def listing_jobs(friends_list, cursors, watermarks, windows=None):
+    """
+    The match-ID listings a run still has to make, as (puuid, startTime,
+    endTime) in epoch seconds: each friend's games after their high-water
+    mark or, for a backfill, each friend's backfill windows. Friends and
+    windows the cursors record as done are skipped.
+    """
+    for puuid in friends_list.values():
+        cursor = cursors.get(puuid, {})
+        if cursor.get("done"):
+            continue
+        if windows is None:
+            yield puuid, watermarks.get(puuid, 0) // 1000, None
+            continue
+        finished = set(cursor.get("windows", []))
+        for start, end in windows:
+            if start not in finished:
+                yield puuid, start, end
+
+
+def ledger_state(listed, cursors, attempts, parked):
+    """
+    Ledger form of {match_id: puuids} plus the per-friend cursors, the failed
+    attempts of those matches and the parked match IDs.
+    """
+    return {
+        "pending": {mid: sorted(puuids) for mid, puuids in listed.items()},
+        "cursors": cursors,
+        "attempts": {mid: attempts[mid] for mid in listed if mid in attempts},
+        "parked": sorted(parked),
+    }
 
 
-def process_matches(friends_list, config, api_key, table_resource):
+class MatchIngest:
+    """
+    The stages of one process_matches run and the state they share:
+    discover (list IDs, drop stored ones) -> fetch -> extract -> encode
+    (Decimal conversion) -> write (BatchWriteItem, 25 at a time).
+    Each stage maps one item to a list of items for the next; matches that
+    fail anywhere before the write end up in `failed`.
+    """
+
+    def __init__(
+        self, friends_list, settings, client, table_resource, cursors, parked=()
+    ):
+        self.routing_region = settings.get("region", "americas")
+        self.match_limit = settings.get("match_count", 5)
+        self.streaming = settings.get("stream_extraction", True)
+        self.check_stored = settings.get("incremental", True)
+        self.client = client
+        self.table = table_resource
+        self.tracked_puuids = {puuid: name for name, puuid in friends_list.items()}
+        self.cursors = cursors
+        # Matches given up on: listings skip them
+        self.parked = set(parked)
+        self.backfill = False
+
+        self._lock = threading.Lock()
+        # {match_id: set of tracked puuids that listed it}
+        self.listed = {}
+        # Matches handed to the fetch stage, each only once
+        self.queued = set()
+        # (matchId, puuid) rows already in the table
+        self.stored = set()
+        self.failed = set()
+        # Failed matches the deadline cut off before they could be fetched
+        self.abandoned = set()
+        # Parked matches some listing still returned
+        self.relisted_parked = set()
+        self._writers = []
+        self._local = threading.local()
+
+    def _deadline_reached(self):
+        deadline = self.client.deadline
+        return deadline is not None and deadline.expired()
+
+    def discover(self, job):
+        """
+        job is ("pending", match_id, puuids) for a match carried over from the
+        ledger, or ("list", puuid, start_time, end_time). Yields the match IDs
+        that still need fetching.
+        """
+        if job[0] == "pending":
+            _, mid, puuids = job
+            with self._lock:
+                self.listed.setdefault(mid, set()).update(puuids)
+                fresh = mid not in self.queued
+                self.queued.add(mid)
+            # Checked against the table when they were first listed
+            return [mid] if fresh else []
+
+        _, puuid, start_time, end_time = job
+        if self._deadline_reached():
+            return []  # Not marked done, so the next run lists it
+        if self.backfill:
+            ids = list_match_window(
+                puuid, self.routing_region, self.client, start_time, end_time
+            )
+        else:
+            print(f"Checking {self.tracked_puuids[puuid]}...")
+            ids = get_match_ids(
+                puuid, self.routing_region, self.match_limit, self.client, start_time
+            )
+        if ids is None:
+            return []
+
+        stored = set()
+        if self.check_stored and ids:
+            stored = match_store.find_stored_keys(
+                self.table, [(mid, puuid) for mid in ids]
+            )
+        with self._lock:
+            self.stored.update(stored)
+            fresh = []
+            for mid in ids:
+                if mid in self.parked:
+                    self.relisted_parked.add(mid)
+                    continue
+                self.listed.setdefault(mid, set()).add(puuid)
+                if (mid, puuid) not in stored and mid not in self.queued:
+                    self.queued.add(mid)
+                    fresh.append(mid)
+            cursor = self.cursors.setdefault(puuid, {})
+            if self.backfill:
+                cursor.setdefault("windows", []).append(start_time)
+            else:
+                cursor["done"] = True
+        return fresh
+
+    def close_windows(self, windows):
+        """
+        Marks friends whose backfill windows are all listed as done.
+        """
+        starts = {start for start, _ in windows}
+        for puuid, cursor in self.cursors.items():
+            if starts.issubset(cursor.get("windows", [])):
+                self.cursors[puuid] = {"done": True}
+
+    def fetch(self, mid):
+        if self._deadline_reached():
+            # Stays pending for the next run; no request is made
+            self.abandon(mid)
+            return []
+        try:
+            data = fetch_match_data(
+                mid,
+                self.routing_region,
+                self.client,
+                self.tracked_puuids,
+                self.streaming,
+            )
+        except DeadlineExceeded as e:
+            print(f"DEBUG: Leaving match {mid} for the next run ({e})")
+            self.abandon(mid)
+            return []
+        if data is None:
+            if self._deadline_reached():
+                # Most likely a read timeout the deadline cut short; the
+                # match itself isn't to blame
+                self.abandon(mid)
+                return []
+            print(f"DEBUG: Skipping match {mid} (No details returned)")
+            self.fail(mid)
+            return []
+        return [(mid, data)]
+
+    def extract(self, fetched):
+        mid, data = fetched
+        rows = extract_match_stats(mid, data, self.tracked_puuids)
+        if not rows:
+            print(f"DEBUG: Skipping match {mid} (No tracked friends found)")
+        return [row for row in rows if (mid, row["puuid"]) not in self.stored]
+
+    def encode(self, row):
+        # Prepare for DynamoDB (Convert Floats to Decimals), stamped with the
+        # write-order keys delta sync reads by
+        return [match_store.stamp_saved(match_store.to_dynamodb(row))]
+
+    def write(self, item):
+        # BatchWriter isn't thread-safe: one per write worker
+        writer = getattr(self._local, "writer", None)
+        if writer is None:
+            writer = self._local.writer = match_store.BatchWriter(self.table)
+            with self._lock:
+                self._writers.append(writer)
+        return writer.put(item)
+
+    def flush(self):
+        return [result for writer in self._writers for result in writer.flush()]
+
+    def fail(self, mid):
+        with self._lock:
+            self.failed.add(mid)
+
+    def abandon(self, mid):
+        # Failed for lack of time: retried next run without using an attempt
+        with self._lock:
+            self.failed.add(mid)
+            self.abandoned.add(mid)
+
+    def pipeline(self, settings, windows=None, checkpoint=None):
+        """
+        Builds the stage pipeline. checkpoint, if given, is called once every
+        listing is done.
+        """
+        concurrency = settings.get("fetch_concurrency", 4)
+        queue_size = settings.get("queue_size", pipeline.DEFAULT_QUEUE_SIZE)
+
+        def finish_discovery():
+            if windows is not None:
+                self.close_windows(windows)
+            if checkpoint is not None:
+                checkpoint()
+            return []
+
+        def stage(name, func, workers, **kwargs):
+            return pipeline.Stage(
+                name,
+                func,
+                workers=settings.get(f"{name}_concurrency", workers),
+                queue_size=queue_size,
+                **kwargs,
+            )
+
+        return pipeline.Pipeline(
+            [
+                stage("discover", self.discover, 2, finish=finish_discovery),
+                stage("fetch", self.fetch, concurrency),
+                stage(
+                    "extract",
+                    self.extract,
+                    1,
+                    on_error=lambda fetched, e: self.fail(fetched[0]),
+                ),
+                stage(
+                    "encode",
+                    self.encode,
+                    1,
+                    on_error=lambda row, e: self.fail(row["matchId"]),
+                ),
+                stage("write", self.write, 1, finish=self.flush),
+            ]
+        )
+
+
+def process_matches(
+    friends_list, config, client, table_resource, ledger=None, backfill_since=None
+):
     """
     Main Logic Controller shared by Local and Lambda.
+    client is a riot_client.RiotClient.
+    Match-centric: every match is fetched once and yields a row for each
+    tracked friend who played in it.
+    Incremental: only games after each friend's stored high-water mark are
+    listed, and matches already saved for every listing friend are skipped.
+    Resumable: with a work_ledger ledger, matches left unsaved at the deadline
+    are picked up by the next run, and a backfill continues with the windows
+    not yet listed. A match that fails to save in max_match_attempts runs is
+    parked: skipped from then on, so it can't hold the ledger open.
+    Backfill: with backfill_since ("YYYY-MM-DD"), every game since that date is
+    listed instead of the latest match_count, in backfill_window_days windows.
+    Pipelined: listing, fetching, extraction, Decimal conversion and writing
+    run as concurrent stages joined by bounded queues (settings
+    <stage>_concurrency and queue_size), so memory stays flat however many
+    matches a run handles.
     """
-    routing_region = config["settings"].get("region", "americas")
-    match_limit = config["settings"].get("match_count", 5)
+    settings = config["settings"]
+    incremental = settings.get("incremental", True)
     processed = 0
     print(
-        f"DEBUG: Starting process_matches with Region: {routing_region}, Match Limit: {match_limit}"
+        f"DEBUG: Starting process_matches with Region: {settings.get('region', 'americas')}, Match Limit: {settings.get('match_count', 5)}, Concurrency: {settings.get('fetch_concurrency', 4)}"
     )
 
-    for name_tag, puuid in friends_list.items():
-        print(f"Checking {name_tag}...")
-        ids = get_match_ids(puuid, routing_region, match_limit, api_key)
-        print(f"DEBUG: Processing {len(ids)} matches for {name_tag}")
-
-        for mid in ids:
-            # 1. Fetch the Rich Data
-            stats = get_match_details(mid, routing_region, puuid, api_key, name_tag)
-
-            if stats:
-                # 2. Prepare for DynamoDB (Convert Floats to Decimals)
-                item = json.loads(json.dumps(stats), parse_float=Decimal)
-
-                try:
-                    # 3. Write to Database
-                    table_resource.put_item(Item=item)
-                    print(f"  > Saved Match {mid} for {name_tag}")
-                    processed += 1
-                except Exception as e:
-                    print(f"  > Error saving {mid}: {e}")
-            else:
-                print(f"DEBUG: Skipping match {mid} for {name_tag} (No stats returned)")
+    max_attempts = settings.get("max_match_attempts", MAX_MATCH_ATTEMPTS)
+    state = ledger.load() if ledger is not None else work_ledger.empty_state()
+    attempts = state.get("attempts", {})
+    parked = set(state.get("parked", []))
+    in_progress = bool(state["pending"] or state["cursors"] or parked)
+    if in_progress:
+        print(
+            f"DEBUG: Resuming: {len(state['pending'])} pending matches, {len(state['cursors'])} friend cursors, {len(parked)} parked matches"
+        )
+    # A regular poll lists every friend each run, since new games may have
+    # finished since; only a backfill carries its window cursors forward
+    cursors = state["cursors"] if backfill_since else {}
+    ingest = MatchIngest(
+        friends_list, settings, client, table_resource, cursors, parked
+    )
+    tracked_puuids = ingest.tracked_puuids
+    # The client outlives warm invocations; report parse cost for this run only
+    client.parse_stats.reset()
+    watermarks = {}
+    if incremental:
+        watermarks = match_store.load_watermarks(table_resource, list(tracked_puuids))
+        print(f"DEBUG: Loaded high-water marks for {len(watermarks)} friends")
+
+    windows = None
+    if backfill_since:
+        window_days = settings.get("backfill_window_days", 30)
+        windows = backfill_windows(backfill_since, window_days)
+        ingest.backfill = True
+        ingest.check_stored = True
+        print(
+            f"DEBUG: Backfilling since {backfill_since} in {len(windows)} windows of {window_days} days"
+        )
+    jobs = itertools.chain(
+        (("pending", mid, puuids) for mid, puuids in state["pending"].items()),
+        (
+            ("list",) + job
+            for job in listing_jobs(friends_list, ingest.cursors, watermarks, windows)
+        ),
+    )
+
+    new_watermarks = dict(watermarks)
+    # Friends with a failed listing, fetch or save keep their old mark so the
+    # games they missed are retried
+    held_back = set()
+    # {match_id: puuids} whose rows failed to write this run
+    write_errors = {}
+
+    def save_ledger(pending):
+        carried = ingest.cursors if backfill_since else {}
+        ledger.save(ledger_state(pending, carried, attempts, parked))
+
+    def checkpoint():
+        # Save the listing so a crash while fetching doesn't redo it
+        nonlocal in_progress
+        if ingest.queued:
+            save_ledger({mid: ingest.listed[mid] for mid in ingest.queued})
+            in_progress = True
+
+    # 1. Run the stages; every written row comes back here as (item, error)
+    stages = ingest.pipeline(
+        settings, windows, checkpoint if ledger is not None else None
+    )
+    for item, error in stages.run(jobs):
+        mid, puuid = item["matchId"], item["puuid"]
+        if error is not None:
+            print(f"  > Error saving {mid}: {error}")
+            write_errors.setdefault(mid, set()).add(puuid)
+            continue
+        print(f"  > Saved Match {mid} for {item['friendName']}")
+        processed += 1
+        game_end = int(item["metadata"]["gameEndTimeStamp"])
+        if game_end > new_watermarks.get(puuid, 0):
+            new_watermarks[puuid] = game_end
+
+    # Matches not fully saved this run stay pending in the ledger, unless
+    # they have now failed max_attempts runs: those are parked, and no longer
+    # hold back their friends' marks
+    unfinished = set(ingest.failed) | set(write_errors)
+    newly_parked = set()
+    for mid in unfinished - ingest.abandoned:
+        attempts[mid] = attempts.get(mid, 0) + 1
+        if attempts[mid] >= max_attempts:
+            print(f"DEBUG: Parking match {mid} after {attempts[mid]} failed runs")
+            newly_parked.add(mid)
+    unfinished -= newly_parked
+    parked |= newly_parked
+    for mid in unfinished:
+        held_back.update(
+            ingest.listed[mid] if mid in ingest.failed else write_errors[mid]
+        )
+    # A friend whose listing failed or was cut off may have games of their own
+    # before a co-played one saved through another friend's listing
+    cursors = ingest.cursors
+    unlisted = [p for p in tracked_puuids if not cursors.get(p, {}).get("done")]
+    held_back.update(unlisted)
+    if ingest.abandoned:
+        print(
+            f"DEBUG: Deadline reached, left {len(ingest.abandoned)} matches for next run"
+        )
+    print(
+        f"DEBUG: Listed {len(ingest.listed)} matches: {len(ingest.queued)} to fetch, {len(ingest.listed) - len(ingest.queued)} already stored"
+    )
+
+    # 2. Advance the high-water marks only past games that were saved
+    writer = match_store.BatchWriter(table_resource)
+    for puuid, last_game_end in new_watermarks.items():
+        if puuid not in held_back and last_game_end != watermarks.get(puuid):
+            writer.put(
+                match_store.watermark_item(puuid, tracked_puuids[puuid], last_game_end)
+            )
+    for item, error in writer.flush():
+        if error is not None:
+            print(
+                f"DEBUG: Failed to save high-water mark for {item['friendName']}: {error}"
+            )
+
+    # 3. Record what is left for the next run, or close the finished pass
+    if ledger is not None:
+        # The next poll lists every friend again anyway; a backfill resumes
+        # with the windows it has not listed
+        carried = unlisted if backfill_since else []
+        if not backfill_since and not unlisted:
+            # Once every friend was listed, a parked match no listing
+            # returned is behind the marks and can't come back
+            parked &= ingest.relisted_parked | newly_parked
+        if unfinished or carried or (parked and not backfill_since):
+            save_ledger({mid: ingest.listed[mid] for mid in unfinished})
+            print(
+                f"DEBUG: Work ledger saved: {len(unfinished)} matches pending, {len(carried)} friends not yet listed, {len(parked)} parked"
+            )
+        elif in_progress:
+            ledger.clear()
+
+    # 4. Tell readers their cached responses are stale
+    if processed:
+        try:
+            version = match_store.bump_dataset_version(table_resource)
+            print(f"DEBUG: Dataset version bumped to {version}")
+        except Exception as e:
+            print(f"DEBUG: Failed to bump dataset version: {e}")
 
+    stages.report()
+    client.parse_stats.report(client.codec.name)
     print(f"DEBUG: process_matches complete. Total processed: {processed}")
     return processed
@@ -3,7 +3,10 @@ import os
 
 import boto3
 import league_logic  # Imports the file above
+import snapshot
+import work_ledger
 from dotenv import load_dotenv
+from riot_client import RiotClient
 
 # 1. Load Local Secrets
 load_dotenv()
@@ -22,5 +25,12 @@ with open("friends_puuids.json", "r") as f:
 
 # 4. Run Logic
 print("--- Starting Local Update ---")
-league_logic.process_matches(friends, config, API_KEY, table)
+client = RiotClient(API_KEY, cache_dir=os.getenv("RIOT_CACHE_DIR", ".riot_cache"))
+# Progress of an unfinished run is kept in a file; run again to continue it
+ledger = work_ledger.FileLedger(os.getenv("LEDGER_FILE", ".work_ledger.json"))
+count = league_logic.process_matches(friends, config, client, table, ledger)
+
+# 5. Publish a dashboard snapshot to a local folder (stand-in for the S3 bucket)
+publisher = snapshot.LocalPublisher(os.getenv("SNAPSHOT_DIR", "snapshots"))
+snapshot.publish_snapshot(publisher, table, "ByMonth", "2026-01-01")
 print("--- Update Complete ---")
@@ -0,0 +1,307 @@
+import datetime
+import time
+from decimal import Decimal
+
+# Poller bookkeeping lives in LeagueMatches under this reserved matchId, one item
+# per friend (puuid). It carries no gameDate, so the dashboard reader never sees it.
+WATERMARK_MATCH_ID = "#watermark"
+# Dataset version marker: bumped by the poller after every run that saved rows,
+# so readers can tell when their cached responses went stale
+DATASET_KEY = {"matchId": "#dataset", "puuid": "version"}
+# BatchGetItem accepts at most 100 keys per request, BatchWriteItem 25 items
+BATCH_GET_LIMIT = 100
+BATCH_WRITE_LIMIT = 25
+MAX_BATCH_ATTEMPTS = 5
+
+
+def to_dynamodb(value):
+    """
+    Returns a copy of a stats row that DynamoDB will accept: float leaves become
+    Decimal (via their repr, same as json's parse_float), everything else is
+    kept as is. One walk, no JSON round trip.
+    """
+    if isinstance(value, dict):
+        return {k: to_dynamodb(v) for k, v in value.items()}
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    if isinstance(value, list):
+        return [to_dynamodb(v) for v in value]
+    return value
+
+
+def batch_get_keys(table_resource, keys, projection="matchId, puuid, lastGameEnd"):
+    """
+    Reads the given (matchId, puuid) keys with BatchGetItem, retrying
+    UnprocessedKeys, and returns the items that exist.
+    """
+    client = table_resource.meta.client
+    table_name = table_resource.name
+    found = []
+
+    for i in range(0, len(keys), BATCH_GET_LIMIT):
+        request = {
+            table_name: {
+                "Keys": [
+                    {"matchId": mid, "puuid": puuid}
+                    for mid, puuid in keys[i : i + BATCH_GET_LIMIT]
+                ],
+                "ProjectionExpression": projection,
+            }
+        }
+        for attempt in range(MAX_BATCH_ATTEMPTS):
+            response = client.batch_get_item(RequestItems=request)
+            found.extend(response.get("Responses", {}).get(table_name, []))
+            request = response.get("UnprocessedKeys") or {}
+            if not request:
+                break
+            time.sleep(0.05 * 2**attempt)
+        else:
+            print(
+                f"DEBUG: Gave up on {len(request[table_name]['Keys'])} unprocessed keys"
+            )
+
+    return found
+
+
+def find_stored_keys(table_resource, keys):
+    """
+    Returns the subset of (matchId, puuid) keys already saved in the table.
+    """
+    items = batch_get_keys(table_resource, list(keys))
+    return {(item["matchId"], item["puuid"]) for item in items}
+
+
+def load_watermarks(table_resource, puuids):
+    """
+    Returns {puuid: last seen gameEndTimestamp (ms)} for friends we have polled.
+    """
+    items = batch_get_keys(
+        table_resource, [(WATERMARK_MATCH_ID, puuid) for puuid in puuids]
+    )
+    return {item["puuid"]: int(item["lastGameEnd"]) for item in items}
+
+
+def get_dataset_version(table_resource):
+    response = table_resource.get_item(
+        Key=DATASET_KEY, ProjectionExpression="datasetVersion"
+    )
+    return int(response.get("Item", {}).get("datasetVersion", 0))
+
+
+def bump_dataset_version(table_resource):
+    response = table_resource.update_item(
+        Key=DATASET_KEY,
+        UpdateExpression="ADD datasetVersion :one SET updatedAt = :now",
+        ExpressionAttributeValues={":one": 1, ":now": int(time.time() * 1000)},
+        ReturnValues="UPDATED_NEW",
+    )
+    return int(response["Attributes"]["datasetVersion"])
+
+
+def months_between(min_date, today):
+    """
+    Returns the "YYYY-MM" buckets from today's month back to min_date's month,
+    newest first.
+    """
+    year, month = today.year, today.month
+    first = min_date[:7]
+    months = []
+    while True:
+        bucket = f"{year:04d}-{month:02d}"
+        if bucket < first:
+            return months
+        months.append(bucket)
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+
+
+def projection(fields):
+    """
+    Builds a ProjectionExpression for attribute paths. Every path segment goes
+    through a #f placeholder so reserved words are safe (boto3's own condition
+    placeholders are #n..., so the two never collide).
+    """
+    names = {}
+    paths = []
+    for field in fields:
+        parts = []
+        for segment in field.split("."):
+            placeholder = names.setdefault(segment, f"#f{len(names)}")
+            parts.append(placeholder)
+        paths.append(".".join(parts))
+    return {
+        "ProjectionExpression": ", ".join(paths),
+        "ExpressionAttributeNames": {v: k for k, v in names.items()},
+    }
+
+
+def month_query(index_name, month, min_date, fields=None):
+    """
+    Query arguments for one month bucket of the gameMonth/gameEndTimestamp
+    index, newest first. With `fields`, only those attribute paths are
+    returned.
+    """
+    from boto3.dynamodb.conditions import Attr, Key
+
+    kwargs = {
+        "IndexName": index_name,
+        "KeyConditionExpression": Key("gameMonth").eq(month),
+        "ScanIndexForward": False,
+    }
+    if month == min_date[:7]:
+        # Only the boundary month can hold games before min_date
+        kwargs["FilterExpression"] = Attr("gameDate").gte(min_date)
+    if fields:
+        kwargs.update(projection(fields))
+    return kwargs
+
+
+def query_all(table_resource, kwargs):
+    """
+    Runs a Query to completion, following LastEvaluatedKey so results past
+    1 MB don't silently lose rows.
+    """
+    items = []
+    while True:
+        response = table_resource.query(**kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def load_rows(table_resource, index_name, min_date, fields=None):
+    """
+    Reads every match row from min_date on, newest first, one Query per month
+    bucket.
+    """
+    # Game dates are Pacific; the UTC month is never behind it
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+
+    # Months newest first, each queried newest first: already sorted
+    items = []
+    for month in months_between(min_date, today):
+        kwargs = month_query(index_name, month, min_date, fields)
+        items.extend(query_all(table_resource, kwargs))
+    return items
+
+
+def saved_month(saved_at):
+    return datetime.datetime.fromtimestamp(
+        saved_at / 1000, datetime.timezone.utc
+    ).strftime("%Y-%m")
+
+
+def stamp_saved(item, saved_at=None):
+    """
+    Sets the savedMonth/savedAt index keys on a row about to be written.
+    Delta sync goes by write order rather than game end, so rows written
+    after newer games (ledger retries, a second friend's row, backfills)
+    still reach clients.
+    """
+    if saved_at is None:
+        saved_at = int(time.time() * 1000)
+    item["savedAt"] = saved_at
+    item["savedMonth"] = saved_month(saved_at)
+    return item
+
+
+def saved_query(index_name, month, min_date, since, fields=None):
+    """
+    Query arguments for the rows of one savedMonth bucket of the
+    savedMonth/savedAt index written after `since` (ms).
+    """
+    from boto3.dynamodb.conditions import Attr, Key
+
+    kwargs = {
+        "IndexName": index_name,
+        "KeyConditionExpression": Key("savedMonth").eq(month)
+        & Key("savedAt").gt(since),
+        # Any bucket can hold a backfilled game from before min_date
+        "FilterExpression": Attr("gameDate").gte(min_date),
+    }
+    if fields:
+        kwargs.update(projection(fields))
+    return kwargs
+
+
+def load_saved_rows(table_resource, index_name, min_date, since, fields=None):
+    """
+    Reads the match rows from min_date on that were written after `since`
+    (ms), oldest write first, one Query per savedMonth bucket.
+    """
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    items = []
+    for month in reversed(months_between(saved_month(since), today)):
+        kwargs = saved_query(index_name, month, min_date, since, fields)
+        items.extend(query_all(table_resource, kwargs))
+    return items
+
+
+def watermark_item(puuid, friend_name, last_game_end):
+    return {
+        "matchId": WATERMARK_MATCH_ID,
+        "puuid": puuid,
+        "friendName": friend_name,
+        "lastGameEnd": last_game_end,
+    }
+
+
+def item_key(item):
+    return (item["matchId"], item["puuid"])
+
+
+class BatchWriter:
+    """
+    Buffers items and writes them with BatchWriteItem in groups of 25,
+    retrying UnprocessedItems with exponential backoff.
+    put() and flush() return the outcome of every item written by that call as
+    (item, error) pairs, where error is None on success, so callers can keep
+    per-item reporting.
+    """
+
+    def __init__(self, table_resource):
+        self.client = table_resource.meta.client
+        self.table_name = table_resource.name
+        # Keyed so a repeated key replaces the buffered item; BatchWriteItem
+        # rejects requests that contain the same key twice
+        self.pending = {}
+
+    def put(self, item):
+        self.pending[item_key(item)] = item
+        if len(self.pending) >= BATCH_WRITE_LIMIT:
+            return self.flush()
+        return []
+
+    def flush(self):
+        items = list(self.pending.values())
+        self.pending = {}
+        results = []
+        for i in range(0, len(items), BATCH_WRITE_LIMIT):
+            results.extend(self._write_batch(items[i : i + BATCH_WRITE_LIMIT]))
+        return results
+
+    def _write_batch(self, batch):
+        requests = [{"PutRequest": {"Item": item}} for item in batch]
+        error = None
+
+        for attempt in range(MAX_BATCH_ATTEMPTS):
+            try:
+                response = self.client.batch_write_item(
+                    RequestItems={self.table_name: requests}
+                )
+            except Exception as e:
+                error = e
+                break
+            requests = response.get("UnprocessedItems", {}).get(self.table_name, [])
+            if not requests:
+                break
+            time.sleep(0.05 * 2**attempt)
+        else:
+            error = RuntimeError(
+                f"still unprocessed after {MAX_BATCH_ATTEMPTS} BatchWriteItem attempts"
+            )
+
+        if error is None:
+            return [(item, None) for item in batch]
+        unsaved = {item_key(r["PutRequest"]["Item"]) for r in requests}
+        return [(item, error if item_key(item) in unsaved else None) for item in batch]
@@ -0,0 +1,229 @@
+import json
+import re
+
+# Reading granularity for streamed match bodies (decompressed bytes)
+CHUNK_SIZE = 16 * 1024
+
+# match-v5 `info` scalars the extractor needs; everything else is skipped
+INFO_FIELDS = ("gameCreation", "gameEndTimestamp", "gameMode")
+
+_WHITESPACE = b" \t\r\n"
+_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+# A whole string or a bracket; strings are matched first so brackets inside them
+# are never counted. A lone '"' means the string runs past the buffer.
+_TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\]]|"', re.DOTALL)
+_SCALAR_END = re.compile(rb"[,\]}\s]")
+
+
+class StreamScanner:
+    """
+    Minimal pull parser over an iterable of JSON byte chunks.
+    Values can be skipped without building Python objects; only the ones asked
+    for are handed to the C json decoder. Consumed bytes are dropped from the
+    buffer, so memory stays around one chunk plus the value being captured.
+    """
+
+    def __init__(self, chunks, loads=json.loads):
+        self.chunks = iter(chunks)
+        self.loads = loads
+        self.bytes_read = 0
+        self.buf = b""
+        self.pos = 0
+        self.mark = None
+        self.eof = False
+
+    def _fill(self):
+        keep = self.pos if self.mark is None else min(self.pos, self.mark)
+        if keep:
+            self.buf = self.buf[keep:]
+            self.pos -= keep
+            if self.mark is not None:
+                self.mark -= keep
+        for chunk in self.chunks:
+            if chunk:
+                self.buf += chunk
+                self.bytes_read += len(chunk)
+                return True
+        self.eof = True
+        return False
+
+    def drain(self):
+        """
+        Reads whatever is left of the body without parsing it, so the
+        response completes (and can be cached, and its connection reused).
+        """
+        for chunk in self.chunks:
+            self.bytes_read += len(chunk)
+        self.eof = True
+
+    def _fail(self, what):
+        raise ValueError(f"Malformed JSON stream: expected {what} at byte {self.pos}")
+
+    def peek(self):
+        """
+        Returns the next non-whitespace byte (as a 1-byte bytes) without consuming it.
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos : self.pos + 1]
+            if not self._fill():
+                self._fail("more data")
+
+    def expect(self, char):
+        if self.peek() != char:
+            self._fail(char.decode())
+        self.pos += 1
+
+    def next_member(self, close):
+        """
+        After a value inside an object/array: consumes ',' and returns True,
+        or consumes the closing bracket and returns False.
+        """
+        char = self.peek()
+        self.pos += 1
+        if char == b",":
+            return True
+        if char != close:
+            self._fail(f"',' or {close.decode()}")
+        return False
+
+    def _skip_string(self):
+        while True:
+            match = _STRING.match(self.buf, self.pos)
+            if match:
+                self.pos = match.end()
+                return
+            if not self._fill():
+                self._fail("end of string")
+
+    def skip_value(self):
+        char = self.peek()
+        if char == b'"':
+            self._skip_string()
+        elif char in (b"{", b"["):
+            self.pos += 1
+            depth = 1
+            while True:
+                for match in _TOKEN.finditer(self.buf, self.pos):
+                    start, end = match.span()
+                    if end - start > 1:
+                        continue  # a complete string
+                    found = self.buf[start]
+                    if found == 0x22:  # '"' with no closing quote yet
+                        self.pos = start
+                        break
+                    depth += 1 if found in b"{[" else -1
+                    if not depth:
+                        self.pos = end
+                        return
+                else:
+                    self.pos = len(self.buf)
+                if not self._fill():
+                    self._fail("end of container")
+        else:
+            while True:
+                match = _SCALAR_END.search(self.buf, self.pos)
+                if match:
+                    self.pos = match.start()
+                    return
+                if not self._fill():
+                    self.pos = len(self.buf)
+                    return
+
+    def read_raw(self):
+        """
+        Returns the undecoded bytes of the next value.
+        """
+        self.peek()
+        self.mark = self.pos
+        try:
+            self.skip_value()
+            return self.buf[self.mark : self.pos]
+        finally:
+            self.mark = None
+
+    def read_value(self):
+        return self.loads(self.read_raw())
+
+    def read_key(self):
+        if self.peek() != b'"':
+            self._fail("object key")
+        key = self.read_value()
+        self.expect(b":")
+        return key
+
+    def members(self):
+        """
+        Iterates over the keys of the object at the cursor. The caller must
+        consume (read or skip) each key's value before advancing.
+        """
+        self.expect(b"{")
+        if self.peek() == b"}":
+            self.pos += 1
+            return
+        while True:
+            yield self.read_key()
+            if not self.next_member(b"}"):
+                return
+
+    def items(self):
+        """
+        Iterates over an array at the cursor; the caller consumes each element.
+        """
+        self.expect(b"[")
+        if self.peek() == b"]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            if not self.next_member(b"]"):
+                return
+
+
+def _select_fields(raw, fields, loads):
+    """
+    Decodes only `fields` from one participant object's raw bytes.
+    """
+    scanner = StreamScanner([raw], loads)
+    selected = {}
+    for key in scanner.members():
+        if key in fields:
+            selected[key] = scanner.read_value()
+        else:
+            scanner.skip_value()
+    return selected
+
+
+def read_match_subset(scanner, tracked_puuids, participant_fields):
+    """
+    Streams a match-v5 document from a StreamScanner and returns a trimmed
+    copy shaped like the original: {"info": {INFO_FIELDS..., "participants":
+    [...]}} where only
+    tracked participants are kept, each reduced to participant_fields.
+    Untracked participants are recognised by a byte search for the tracked
+    PUUIDs and never decoded.
+    """
+    needles = [puuid.encode("utf-8") for puuid in tracked_puuids]
+    fields = set(participant_fields) | {"puuid"}
+    info = {"participants": []}
+
+    for key in scanner.members():
+        if key != "info":
+            scanner.skip_value()
+            continue
+        for info_key in scanner.members():
+            if info_key in INFO_FIELDS:
+                info[info_key] = scanner.read_value()
+            elif info_key == "participants":
+                for _ in scanner.items():
+                    raw = scanner.read_raw()
+                    if any(needle in raw for needle in needles):
+                        p = _select_fields(raw, fields, scanner.loads)
+                        if p.get("puuid") in tracked_puuids:
+                            info["participants"].append(p)
+            else:
+                scanner.skip_value()
+
+    return {"info": info}
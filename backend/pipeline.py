@@ -0,0 +1,224 @@
+import queue
+import threading
+import time
+
+# Items a stage's input queue holds before upstream stages block (backpressure)
+DEFAULT_QUEUE_SIZE = 16
+# How often a blocked put/get checks whether the pipeline was stopped
+POLL_SECONDS = 0.1
+
+_DONE = object()
+
+
+class PipelineStopped(Exception):
+    pass
+
+
+class Stage:
+    """
+    One step of a Pipeline: `workers` threads each take an item from the
+    stage's bounded input queue and pass func(item)'s outputs (an iterable,
+    possibly empty) on to the next stage.
+    finish, if given, runs once after the last item and returns further
+    outputs (e.g. flushing a batch). on_error(item, exc) is called when func
+    raises; the item is then dropped.
+    """
+
+    def __init__(
+        self,
+        name,
+        func,
+        workers=1,
+        queue_size=DEFAULT_QUEUE_SIZE,
+        finish=None,
+        on_error=None,
+    ):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.finish = finish
+        self.on_error = on_error
+
+
+class StageStats:
+    """
+    Thread-safe throughput counters for one stage.
+    """
+
+    def __init__(self, name, workers):
+        self._lock = threading.Lock()
+        self.name = name
+        self.workers = workers
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.peak_queue = 0
+        self.first_start = None
+        self.last_end = None
+
+    def record(self, outputs, seconds, failed=False):
+        end = time.perf_counter()
+        with self._lock:
+            self.items_in += 1
+            self.items_out += outputs
+            self.errors += failed
+            self.busy_seconds += seconds
+            if self.first_start is None or end - seconds < self.first_start:
+                self.first_start = end - seconds
+            self.last_end = end
+
+    def finished(self, outputs):
+        with self._lock:
+            self.items_out += outputs
+
+    def queued(self, depth):
+        with self._lock:
+            self.peak_queue = max(self.peak_queue, depth)
+
+    def report(self):
+        wall = (self.last_end - self.first_start) if self.items_in else 0.0
+        rate = self.items_in / wall if wall > 0 else 0.0
+        print(
+            f"DEBUG: Stage {self.name} x{self.workers}: {self.items_in} in, "
+            f"{self.items_out} out, {self.errors} errors, {rate:.1f} items/s, "
+            f"busy {self.busy_seconds:.2f} s, peak queue {self.peak_queue}"
+        )
+
+
+class Pipeline:
+    """
+    Runs stages concurrently, connected by bounded queues: each stage works on
+    its own thread pool, and a full queue blocks the stage feeding it, so at
+    most the queues' capacity plus one item per worker is in flight whatever
+    the size of the source.
+    """
+
+    def __init__(self, stages):
+        self.stages = stages
+        self.stats = [StageStats(stage.name, stage.workers) for stage in stages]
+        self._stop = threading.Event()
+
+    def run(self, source):
+        """
+        Feeds `source` (any iterable, consumed lazily) through the stages and
+        yields the last stage's outputs as they arrive.
+        """
+        inboxes = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        outbox = queue.Queue(maxsize=self.stages[-1].queue_size)
+        threads = [
+            threading.Thread(
+                target=self._feed, args=(source, inboxes[0], self.stages[0])
+            )
+        ]
+        for i, stage in enumerate(self.stages):
+            downstream = inboxes[i + 1] if i + 1 < len(self.stages) else outbox
+            closers = 1 if i + 1 == len(self.stages) else self.stages[i + 1].workers
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for _ in range(stage.workers):
+                threads.append(
+                    threading.Thread(
+                        target=self._work,
+                        args=(
+                            stage,
+                            self.stats[i],
+                            inboxes[i],
+                            downstream,
+                            closers,
+                            remaining,
+                            lock,
+                        ),
+                    )
+                )
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        try:
+            while True:
+                item = self._get(outbox)
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # Also reached when the consumer stops early: unblock every thread
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+    def report(self):
+        for stats in self.stats:
+            stats.report()
+
+    def _feed(self, source, inbox, stage):
+        try:
+            try:
+                for item in source:
+                    self._put(inbox, item)
+            except PipelineStopped:
+                raise
+            except Exception as e:
+                # Still close the stages below, or the consumer waits forever
+                print(f"DEBUG: Pipeline source failed: {e}")
+            for _ in range(stage.workers):
+                self._put(inbox, _DONE)
+        except PipelineStopped:
+            pass
+
+    def _work(self, stage, stats, inbox, downstream, closers, remaining, lock):
+        try:
+            while True:
+                item = self._get(inbox)
+                if item is _DONE:
+                    break
+                stats.queued(inbox.qsize() + 1)
+                start = time.perf_counter()
+                try:
+                    outputs = list(stage.func(item))
+                except Exception as e:
+                    print(f"DEBUG: Stage {stage.name} failed on an item: {e}")
+                    stats.record(0, time.perf_counter() - start, failed=True)
+                    if stage.on_error is not None:
+                        stage.on_error(item, e)
+                    continue
+                stats.record(len(outputs), time.perf_counter() - start)
+                for output in outputs:
+                    self._put(downstream, output)
+
+            # The last worker of a stage runs finish and closes the next stage
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                if stage.finish is not None:
+                    try:
+                        outputs = list(stage.finish())
+                    except Exception as e:
+                        print(f"DEBUG: Stage {stage.name} failed to finish: {e}")
+                        outputs = []
+                    stats.finished(len(outputs))
+                    for output in outputs:
+                        self._put(downstream, output)
+                for _ in range(closers):
+                    self._put(downstream, _DONE)
+        except PipelineStopped:
+            pass
+
+    def _put(self, q, item):
+        while True:
+            try:
+                q.put(item, timeout=POLL_SECONDS)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    raise PipelineStopped()
+
+    def _get(self, q):
+        while True:
+            try:
+                return q.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                if self._stop.is_set():
+                    raise PipelineStopped()
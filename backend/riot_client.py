@@ -0,0 +1,589 @@
+import gzip
+import hashlib
+import os
+import threading
+import time
+from urllib.parse import urlencode
+
+# requests is imported on first use (see RiotClient/cached_response): it is the
+# poller's heaviest import and modules that only need constants shouldn't pay it
+from json_codec import ParseStats, get_codec
+
+# Seconds to wait for the TCP/TLS connect and for each read off the socket
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10
+# Keep-alive connections held open per routing host (americas, europe, ...)
+DEFAULT_POOL_SIZE = 10
+# Development key limits, used until the first response reports the real ones
+DEFAULT_APP_RATE_LIMIT = "20:1,100:120"
+# Fraction of every limit held back so we pace just under Riot's ceiling
+DEFAULT_SAFETY_MARGIN = 0.05
+# How many times a 429 is waited out and retried before giving up
+DEFAULT_MAX_RETRIES = 3
+# Used when a 429 arrives without a Retry-After header (e.g. service limits)
+DEFAULT_RETRY_AFTER = 1.0
+# cache_ttl value for responses that never change (finished match payloads)
+CACHE_FOREVER = -1
+# Seconds before the hard deadline at which new Riot work stops, leaving time to
+# write what was fetched
+DEFAULT_DEADLINE_MARGIN = 8.0
+# On-disk cache bound; Lambda's /tmp is 512 MB by default
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Pruning removes the oldest entries until the cache is this fraction of its cap
+CACHE_PRUNE_TARGET = 0.8
+
+
+def parse_rate_limits(header):
+    """
+    Parses a Riot limit header like "20:1,100:120" into [(20, 1), (100, 120)].
+    The same format is used by the *-Count headers (count:seconds).
+    """
+    limits = []
+    for part in (header or "").split(","):
+        if ":" not in part:
+            continue
+        count, seconds = part.split(":", 1)
+        limits.append((int(count), int(seconds)))
+    return limits
+
+
+class DeadlineExceeded(Exception):
+    """
+    Raised instead of starting a request that can't finish before the deadline.
+    """
+
+
+class Deadline:
+    """
+    Time budget for one run, usually the Lambda's remaining time.
+    remaining() hits zero `safety_margin` seconds before the hard limit, so
+    callers stop fetching while there is still time to save results.
+    """
+
+    def __init__(self, seconds, safety_margin=DEFAULT_DEADLINE_MARGIN):
+        self.expires = time.monotonic() + seconds - safety_margin
+
+    @classmethod
+    def from_context(cls, context, safety_margin=DEFAULT_DEADLINE_MARGIN):
+        return cls(context.get_remaining_time_in_millis() / 1000, safety_margin)
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def cap(self, timeout):
+        """
+        Returns the (connect, read) timeout with each part capped by the time
+        left, or raises DeadlineExceeded if none is.
+        """
+        left = self.remaining()
+        if left <= 0:
+            raise DeadlineExceeded("deadline reached")
+        return tuple(min(part, left) for part in timeout)
+
+
+class TokenBucket:
+    """
+    One Riot rate-limit window: `capacity` requests per `seconds`.
+    Riot windows start at the first request and reset wholesale once they
+    elapse, so the bucket refills in full at each window boundary.
+    """
+
+    def __init__(self, limit, seconds, safety_margin=DEFAULT_SAFETY_MARGIN):
+        self.limit = limit
+        self.seconds = seconds
+        self.capacity = max(1, int(limit * (1 - safety_margin)))
+        self.used = 0
+        self.window_start = None
+
+    def _roll(self, now):
+        if self.window_start is None or now - self.window_start >= self.seconds:
+            self.window_start = now
+            self.used = 0
+
+    def wait_time(self, now):
+        """
+        Seconds until a token is available (0 if one is available now).
+        """
+        self._roll(now)
+        if self.used < self.capacity:
+            return 0
+        return self.window_start + self.seconds - now
+
+    def consume(self, now):
+        self._roll(now)
+        self.used += 1
+
+    def sync(self, server_count, now):
+        """
+        Adopts Riot's view of the window if it has counted more than we have
+        (e.g. another process sharing the key).
+        """
+        self._roll(now)
+        self.used = max(self.used, server_count)
+
+
+class RateLimiter:
+    """
+    Keeps per-application and per-method token buckets for each routing region,
+    fed by the X-App-Rate-Limit / X-Method-Rate-Limit headers on every response,
+    and blocks callers until every applicable bucket has a token.
+    Thread-safe, so concurrent fetchers share one budget.
+    """
+
+    def __init__(
+        self,
+        default_app_limits=DEFAULT_APP_RATE_LIMIT,
+        safety_margin=DEFAULT_SAFETY_MARGIN,
+    ):
+        self.default_app_limits = parse_rate_limits(default_app_limits)
+        self.safety_margin = safety_margin
+        self._buckets = {}
+        self._blocked_until = {}
+        self._lock = threading.Lock()
+
+    def _scope_buckets(self, scope):
+        if scope not in self._buckets:
+            limits = self.default_app_limits if scope[0] == "app" else []
+            self._set_limits(scope, limits)
+        return self._buckets[scope]
+
+    def _set_limits(self, scope, limits):
+        current = self._buckets.get(scope, {})
+        buckets = {}
+        for limit, seconds in limits:
+            bucket = current.get(seconds)
+            if bucket is None or bucket.limit != limit:
+                bucket = TokenBucket(limit, seconds, self.safety_margin)
+                if seconds in current:
+                    bucket.used = current[seconds].used
+                    bucket.window_start = current[seconds].window_start
+            buckets[seconds] = bucket
+        self._buckets[scope] = buckets
+
+    def acquire(self, region, method, deadline=None):
+        """
+        Blocks until a request to `method` in `region` fits every limit, then
+        takes a token from each bucket. Raises DeadlineExceeded rather than
+        waiting past `deadline`.
+        """
+        scopes = [("app", region), ("method", region, method)]
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = 0
+                for scope in scopes:
+                    wait = max(wait, self._blocked_until.get(scope, 0) - now)
+                    for bucket in self._scope_buckets(scope).values():
+                        wait = max(wait, bucket.wait_time(now))
+                if wait <= 0:
+                    for scope in scopes:
+                        for bucket in self._buckets[scope].values():
+                            bucket.consume(now)
+                    return
+            if deadline is not None and wait >= deadline.remaining():
+                raise DeadlineExceeded(f"rate limit wait of {wait:.1f}s")
+            time.sleep(wait)
+
+    def update(self, region, method, headers):
+        """
+        Refreshes limits and counts from a Riot response's headers.
+        """
+        with self._lock:
+            now = time.monotonic()
+            for scope, prefix in (
+                (("app", region), "X-App-Rate-Limit"),
+                (("method", region, method), "X-Method-Rate-Limit"),
+            ):
+                limits = parse_rate_limits(headers.get(prefix))
+                if limits:
+                    self._set_limits(scope, limits)
+                buckets = self._buckets.get(scope, {})
+                for count, seconds in parse_rate_limits(headers.get(f"{prefix}-Count")):
+                    if seconds in buckets:
+                        buckets[seconds].sync(count, now)
+
+    def penalize(self, region, method, headers):
+        """
+        Applies a 429's Retry-After to the scope Riot says we exceeded.
+        Returns the number of seconds callers will be held back.
+        """
+        try:
+            retry_after = float(headers.get("Retry-After", DEFAULT_RETRY_AFTER))
+        except ValueError:
+            retry_after = DEFAULT_RETRY_AFTER
+        limit_type = headers.get("X-Rate-Limit-Type", "")
+        if limit_type == "application":
+            scope = ("app", region)
+        else:
+            # "method" and "service" (upstream) limits only hold back this endpoint
+            scope = ("method", region, method)
+        with self._lock:
+            until = time.monotonic() + retry_after
+            self._blocked_until[scope] = max(self._blocked_until.get(scope, 0), until)
+        return retry_after
+
+
+class ResponseCache:
+    """
+    On-disk cache of successful Riot responses, one gzip file per request.
+    Files are named by the SHA-256 of the request (path + query, never the key)
+    and written atomically, so concurrent fetchers and containers can share
+    the directory (e.g. Lambda /tmp across warm invocations).
+    The directory is kept under max_bytes: once a write takes it over, the
+    oldest entries are deleted.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Running estimate between prunes; each prune recounts from disk
+        self._bytes = sum(size for _, size, _ in self._entries())
+
+    def _file(self, cache_key):
+        digest = hashlib.sha256(cache_key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json.gz")
+
+    def _entries(self):
+        """
+        [(path, size, mtime)] of every cache file, leftover temp files included.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue  # Removed by another writer meanwhile
+            entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def load(self, cache_key, ttl):
+        """
+        Returns the cached body bytes, or None if missing or older than ttl
+        seconds (ttl == CACHE_FOREVER never expires).
+        """
+        path = self._file(cache_key)
+        try:
+            if ttl != CACHE_FOREVER and time.time() - os.path.getmtime(path) > ttl:
+                return None
+            with gzip.open(path, "rb") as f:
+                return f.read()
+        except (OSError, EOFError):
+            return None
+
+    def store(self, cache_key, body):
+        writer = self.writer(cache_key)
+        writer.write(body)
+        writer.commit()
+
+    def writer(self, cache_key):
+        """
+        Returns a CacheWriter for writing a body to the cache in pieces.
+        """
+        return CacheWriter(self, self._file(cache_key))
+
+    def _added(self, size):
+        with self._lock:
+            self._bytes += size
+            if self._bytes <= self.max_bytes:
+                return
+            self.prune()
+
+    def prune(self):
+        """
+        Deletes the oldest files until the cache is back under
+        CACHE_PRUNE_TARGET of max_bytes. Callers hold the lock.
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * CACHE_PRUNE_TARGET
+        removed = 0
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._bytes = total
+        print(f"DEBUG: Pruned {removed} cache entries ({total / 1048576:.1f} MB left)")
+
+
+class CacheWriter:
+    """
+    Writes one cache entry chunk by chunk into a temp file. commit() makes it
+    visible atomically; abort() (or any write error) discards it, so a partial
+    body is never served and never left on disk.
+    """
+
+    def __init__(self, cache, path):
+        self.cache = cache
+        self.path = path
+        self.tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self.file = None
+        self.failed = False
+
+    def write(self, chunk):
+        if self.failed:
+            return
+        try:
+            if self.file is None:
+                self.file = gzip.open(self.tmp_path, "wb", compresslevel=6)
+            self.file.write(chunk)
+        except OSError as e:
+            print(f"DEBUG: Could not write cache entry {self.path}: {e}")
+            self.abort()
+
+    def commit(self):
+        if self.failed:
+            return
+        try:
+            if self.file is None:
+                self.file = gzip.open(self.tmp_path, "wb", compresslevel=6)
+            self.file.close()
+            size = os.path.getsize(self.tmp_path)
+            os.replace(self.tmp_path, self.path)
+        except OSError as e:
+            print(f"DEBUG: Could not write cache entry {self.path}: {e}")
+            self.abort()
+            return
+        self.cache._added(size)
+
+    def abort(self):
+        self.failed = True
+        try:
+            if self.file is not None:
+                self.file.close()
+        except OSError:
+            pass
+        # A full disk leaves a partial file behind; don't let it pile up
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+def tee_to_cache(response, writer):
+    """
+    Makes a streamed response's iter_content() also write every chunk to the
+    cache. The entry is committed only if the body is read to the end.
+    """
+    iter_content = response.iter_content
+
+    def teed(chunk_size=1, decode_unicode=False):
+        complete = False
+        try:
+            for chunk in iter_content(chunk_size, decode_unicode):
+                writer.write(chunk)
+                yield chunk
+            complete = True
+        finally:
+            if complete:
+                writer.commit()
+            else:
+                writer.abort()
+
+    response.iter_content = teed
+
+
+def cached_response(url, body):
+    """
+    Wraps cached body bytes in a requests.Response so callers can't tell a hit
+    from a live 200.
+    """
+    import requests
+    from requests.structures import CaseInsensitiveDict
+
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.encoding = "utf-8"
+    response.headers = CaseInsensitiveDict(
+        {"Content-Type": "application/json;charset=utf-8", "X-Cache": "HIT"}
+    )
+    response._content = body
+    response._content_consumed = True
+    return response
+
+
+class RiotClient:
+    """
+    Thin wrapper around a pooled, keep-alive requests.Session for the Riot API.
+    Create it once per container so warm invocations reuse the open connections.
+    Every request is paced by a shared RateLimiter and 429s are waited out.
+    A 401/403 calls refresh_api_key() (if given) for a fresh key and retries once,
+    so an expired development key is replaced without waiting out a cache TTL.
+    With a Deadline set, every request's timeouts are capped by the time left
+    and requests that can't start in time raise DeadlineExceeded.
+    With a cache_dir, GETs that ask for it are served from a ResponseCache
+    holding at most cache_max_bytes.
+    JSON bodies are decoded from raw bytes by a pluggable codec (see
+    json_codec), never via requests' charset detection, and timed per endpoint.
+    """
+
+    def __init__(
+        self,
+        api_key,
+        pool_size=DEFAULT_POOL_SIZE,
+        connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+        read_timeout=DEFAULT_READ_TIMEOUT,
+        max_retries=DEFAULT_MAX_RETRIES,
+        rate_limiter=None,
+        cache_dir=None,
+        cache_max_bytes=DEFAULT_CACHE_MAX_BYTES,
+        codec=None,
+        refresh_api_key=None,
+    ):
+        self.refresh_api_key = refresh_api_key
+        self._key_lock = threading.Lock()
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.deadline = None
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.cache = ResponseCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self.codec = codec if hasattr(codec, "loads") else get_codec(codec)
+        self.parse_stats = ParseStats()
+
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.headers.update(
+            {"Accept": "application/json", "Accept-Encoding": "gzip, deflate"}
+        )
+        self.set_api_key(api_key)
+
+    def set_api_key(self, api_key):
+        """
+        Swaps the key used for every following request (e.g. after a rotation).
+        """
+        self.api_key = api_key
+        if api_key is None:
+            self.session.headers.pop("X-Riot-Token", None)
+        else:
+            self.session.headers["X-Riot-Token"] = api_key
+
+    def set_deadline(self, deadline):
+        """
+        Applies a Deadline (or None) to every following request.
+        """
+        self.deadline = deadline
+
+    def prewarm(self, routing_region):
+        """
+        Opens a pooled connection (TCP + TLS handshake) to the routing host
+        ahead of the first real request. Sent without the API key, so it is
+        never counted against the rate limits.
+        """
+        response = self.session.head(
+            f"https://{routing_region}.api.riotgames.com/",
+            headers={"X-Riot-Token": None},
+            timeout=self.timeout,
+        )
+        # Reading the (empty) body hands the connection back to the pool
+        response.content
+
+    def _refresh_key(self, rejected_key):
+        """
+        Swaps in a fresh key after `rejected_key` was refused. Returns True if
+        the request is worth retrying (the key in use has changed).
+        """
+        if self.refresh_api_key is None:
+            return False
+        with self._key_lock:
+            # Another thread may already have refreshed it
+            if self.api_key == rejected_key:
+                print("DEBUG: Riot API key rejected, fetching a fresh one")
+                new_key = self.refresh_api_key()
+                if new_key != rejected_key:
+                    self.set_api_key(new_key)
+            return self.api_key != rejected_key
+
+    def get(
+        self,
+        routing_region,
+        path,
+        params=None,
+        method=None,
+        cache_ttl=None,
+        stream=False,
+    ):
+        """
+        Issues a GET against https://{routing_region}.api.riotgames.com{path}.
+        `method` names the endpoint for per-method rate limits (defaults to path).
+        `cache_ttl` (seconds, or CACHE_FOREVER) lets 200 responses be served
+        from the on-disk cache; None bypasses it.
+        `stream` leaves a live body unread so it can be consumed with
+        iter_content(); a body being cached is written to the cache as it is
+        read. Cache hits are always in memory (X-Cache: HIT), so callers should
+        decode those with decode_json.
+        Returns the requests.Response; status handling is left to the caller,
+        except 429s, which are retried after Retry-After up to max_retries.
+        """
+        url = f"https://{routing_region}.api.riotgames.com{path}"
+        method = method or path
+
+        if self.cache is None or cache_ttl is None:
+            return self._get_live(url, routing_region, method, params, stream)
+
+        query = urlencode(sorted((params or {}).items()))
+        cache_key = f"{routing_region}{path}?{query}"
+        body = self.cache.load(cache_key, cache_ttl)
+        if body is not None:
+            return cached_response(url, body)
+
+        response = self._get_live(url, routing_region, method, params, stream)
+        if response.status_code == 200:
+            if stream:
+                tee_to_cache(response, self.cache.writer(cache_key))
+            else:
+                self.cache.store(cache_key, response.content)
+        return response
+
+    def decode_json(self, response, method):
+        """
+        Decodes a response body straight from its UTF-8 bytes with the codec.
+        Riot always sends UTF-8 JSON, so requests' encoding guess is skipped.
+        """
+        return self.parse_stats.timed(method, self.codec.loads, response.content)
+
+    def _get_live(self, url, routing_region, method, params, stream):
+        key_refreshed = False
+        deadline = self.deadline
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire(routing_region, method, deadline)
+            timeout = self.timeout if deadline is None else deadline.cap(self.timeout)
+            api_key = self.api_key
+            response = self.session.get(
+                url, params=params, timeout=timeout, stream=stream
+            )
+            self.rate_limiter.update(routing_region, method, response.headers)
+            if response.status_code in (401, 403) and not key_refreshed:
+                key_refreshed = True
+                if self._refresh_key(api_key):
+                    response.close()
+                    continue
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+
+            response.close()
+            retry_after = self.rate_limiter.penalize(
+                routing_region, method, response.headers
+            )
+            print(
+                f"DEBUG: Rate limited on {method} "
+                f"({response.headers.get('X-Rate-Limit-Type', 'unknown')}), "
+                f"retrying in {retry_after}s"
+            )
+        return response
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,137 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+
+import boto3
+import dashboard_stats
+import match_store
+from botocore.exceptions import ClientError
+
+# Objects live under this prefix of the frontend bucket (or local directory)
+SNAPSHOT_PREFIX = "snapshots"
+POINTER_NAME = "latest.json"
+# Snapshots are content-addressed, so browsers may keep them forever; the
+# pointer is what tells them a new one exists
+SNAPSHOT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+POINTER_CACHE_CONTROL = "public, max-age=60, must-revalidate"
+
+
+class S3Publisher:
+    """
+    Writes snapshot objects to the S3 bucket that hosts the dashboard.
+    """
+
+    def __init__(self, bucket, prefix=SNAPSHOT_PREFIX):
+        self.s3 = boto3.client("s3")
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def read_pointer(self):
+        try:
+            response = self.s3.get_object(
+                Bucket=self.bucket, Key=f"{self.prefix}/{POINTER_NAME}"
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "NoSuchKey":
+                return None
+            raise
+        # S3 hands back the stored (gzip) bytes as they are
+        return json.loads(gzip.decompress(response["Body"].read()))
+
+    def write(self, name, body, cache_control):
+        # Stored gzip-encoded; browsers decode it transparently
+        self.s3.put_object(
+            Bucket=self.bucket,
+            Key=f"{self.prefix}/{name}",
+            Body=gzip.compress(body, mtime=0),
+            ContentType="application/json",
+            ContentEncoding="gzip",
+            CacheControl=cache_control,
+        )
+
+
+class LocalPublisher:
+    """
+    Stand-in for S3 when running locally: plain files in a directory.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def read_pointer(self):
+        try:
+            with open(os.path.join(self.directory, POINTER_NAME), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write(self, name, body, cache_control):
+        path = os.path.join(self.directory, name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+
+def get_publisher():
+    """
+    Picks the snapshot destination from the environment: SNAPSHOT_BUCKET (S3),
+    else SNAPSHOT_DIR (local directory), else None (publishing disabled).
+    """
+    if os.environ.get("SNAPSHOT_BUCKET"):
+        return S3Publisher(os.environ["SNAPSHOT_BUCKET"])
+    if os.environ.get("SNAPSHOT_DIR"):
+        return LocalPublisher(os.environ["SNAPSHOT_DIR"])
+    return None
+
+
+def build_snapshot(table_resource, index_name, min_date):
+    """
+    Renders the dashboard's full read model: every match row (dashboard
+    fields only) plus the /summary aggregates, as JSON bytes.
+    """
+    rows = match_store.load_rows(
+        table_resource, index_name, min_date, fields=dashboard_stats.DASHBOARD_FIELDS
+    )
+    snapshot = {
+        "matches": rows,
+        "summary": dashboard_stats.compute_summary(rows),
+    }
+    return json.dumps(snapshot, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def publish_snapshot(publisher, table_resource, index_name, min_date):
+    """
+    Publishes a new snapshot under a content-hashed name and repoints
+    latest.json at it. Skipped when latest.json already records the current
+    dataset version (nothing was saved since it was published), or when the
+    rendered content is unchanged. A run whose publish failed therefore leaves
+    an older version behind and the next run publishes, new games or not.
+    Returns the published snapshot name, or None if skipped.
+    """
+    # Read before rendering: rows saved meanwhile bump it past what we record
+    version = match_store.get_dataset_version(table_resource)
+    pointer = publisher.read_pointer()
+    if pointer and pointer.get("datasetVersion") == version:
+        print(f"DEBUG: Snapshot already at dataset version {version}.")
+        return None
+
+    body = build_snapshot(table_resource, index_name, min_date)
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    name = f"{digest}.json"
+    if not pointer or pointer.get("hash") != digest:
+        publisher.write(name, body, SNAPSHOT_CACHE_CONTROL)
+    pointer = {
+        "snapshot": name,
+        "hash": digest,
+        "datasetVersion": version,
+        "publishedAt": int(time.time() * 1000),
+    }
+    publisher.write(
+        POINTER_NAME, json.dumps(pointer).encode("utf-8"), POINTER_CACHE_CONTROL
+    )
+    print(f"DEBUG: Published snapshot {name} ({len(body)} bytes, version {version})")
+    return name
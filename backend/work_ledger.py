@@ -0,0 +1,82 @@
+import gzip
+import json
+import os
+import time
+
+# Ledgers live in LeagueMatches under this reserved matchId, one item per job.
+# Like the watermarks they carry no gameDate, so the dashboard never sees them.
+LEDGER_MATCH_ID = "#ledger"
+
+
+def empty_state():
+    """
+    A job's progress: "pending" maps match IDs that were listed but not yet
+    saved to the puuids that listed them; "cursors" maps each friend's puuid
+    to how far their listing got ({"done": True} once finished); "attempts"
+    counts the runs that failed to save each pending match; "parked" lists
+    the matches given up on, which listings skip.
+    """
+    return {"pending": {}, "cursors": {}, "attempts": {}, "parked": []}
+
+
+class DynamoLedger:
+    """
+    Keeps a job's progress in one LeagueMatches item so the next invocation
+    continues where the last one stopped.
+    """
+
+    def __init__(self, table_resource, job="poll"):
+        self.table = table_resource
+        self.key = {"matchId": LEDGER_MATCH_ID, "puuid": job}
+
+    def load(self):
+        item = self.table.get_item(Key=self.key).get("Item")
+        if not item:
+            return empty_state()
+        # boto3 hands binary attributes back wrapped in a Binary
+        data = getattr(item["state"], "value", item["state"])
+        return json.loads(gzip.decompress(data))
+
+    def save(self, state):
+        # Gzipped JSON: no Decimals back, no empty-attribute rules, and a
+        # backfill's thousands of pending IDs (the same few puuids repeated)
+        # stay far below the 400 KB item limit
+        data = json.dumps(state, separators=(",", ":")).encode("utf-8")
+        self.table.put_item(
+            Item={
+                **self.key,
+                "state": gzip.compress(data, mtime=0),
+                "updatedAt": int(time.time() * 1000),
+            }
+        )
+
+    def clear(self):
+        self.table.delete_item(Key=self.key)
+
+
+class FileLedger:
+    """
+    Stand-in for the DynamoDB ledger when running locally: one JSON file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return empty_state()
+
+    def save(self, state):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
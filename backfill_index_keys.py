@@ -0,0 +1,54 @@
+import os
+import sys
+
+import boto3
+
+# saved_month lives with the Lambda code in backend/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+import match_store  # noqa: E402
+
+# One-off: copies the ByMonth index keys (gameMonth, gameEndTimestamp) and the
+# BySaved index keys (savedMonth, savedAt) onto rows saved before the poller
+# started writing them. Older rows count as saved when their game ended.
+# Run once after `terraform apply` creates the indexes.
+
+dynamodb = boto3.resource("dynamodb", region_name="us-west-1")
+table = dynamodb.Table("LeagueMatches")
+
+
+def main():
+    kwargs = {
+        "ProjectionExpression": "matchId, puuid, gameDate, gameMonth, savedAt, metadata.gameEndTimeStamp"
+    }
+    updated = 0
+    while True:
+        response = table.scan(**kwargs)
+        for item in response.get("Items", []):
+            # Watermark items have no gameDate and stay out of the indexes
+            if "gameDate" not in item or ("gameMonth" in item and "savedAt" in item):
+                continue
+            game_end = int(item.get("metadata", {}).get("gameEndTimeStamp", 0))
+            table.update_item(
+                Key={"matchId": item["matchId"], "puuid": item["puuid"]},
+                UpdateExpression=(
+                    "SET gameMonth = if_not_exists(gameMonth, :m), "
+                    "gameEndTimestamp = if_not_exists(gameEndTimestamp, :t), "
+                    "savedMonth = if_not_exists(savedMonth, :sm), "
+                    "savedAt = if_not_exists(savedAt, :t)"
+                ),
+                ExpressionAttributeValues={
+                    ":m": item["gameDate"][:7],
+                    ":t": game_end,
+                    ":sm": match_store.saved_month(game_end),
+                },
+            )
+            updated += 1
+        if "LastEvaluatedKey" not in response:
+            break
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    print(f"Done! Added index keys to {updated} items.")
+
+
+if __name__ == "__main__":
+    main()
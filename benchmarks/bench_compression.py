@@ -0,0 +1,113 @@
+"""
+Size/latency benchmark for /matches response compression.
+
+Builds synthetic match histories (1k, 10k and 100k rows shaped like the rows
+the poller stores), serializes them the way get_matches does, and reports the
+raw, gzip and (if installed) brotli sizes, the base64 size API Gateway
+actually carries, and the time to compress. Lambda rejects response payloads
+over 6 MB.
+
+Run from the repo root:  python benchmarks/bench_compression.py [rows ...]
+"""
+
+import base64
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+import league_logic  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+LAMBDA_PAYLOAD_LIMIT = 6 * 1024 * 1024
+FRIENDS = ["Werras#NA1", "IamTheMuffinKing#NA1", "Woah Its Cutty#NA1"]
+CHAMPIONS = ["Ahri", "Garen", "Lux", "Trundle", "Pantheon", "Volibear", "Jinx"]
+POSITIONS = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+
+
+def synthetic_rows(count, seed=7):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        participant = {
+            field: rng.randint(0, 30) for field in league_logic.PARTICIPANT_FIELDS
+        }
+        participant.update(
+            {
+                "puuid": f"puuid-{i % len(FRIENDS)}",
+                "championName": rng.choice(CHAMPIONS),
+                "teamPosition": rng.choice(POSITIONS),
+                "win": rng.random() < 0.5,
+                "timePlayed": rng.randint(900, 2700),
+                "goldEarned": rng.randint(5000, 20000),
+                "totalDamageDealtToChampions": rng.randint(3000, 60000),
+            }
+        )
+        end = 1768000000000 + i * 1_800_000
+        info = {"gameMode": rng.choice(["CLASSIC", "ARAM"]), "gameEndTimestamp": end}
+        rows.append(
+            league_logic.extract_player_stats(
+                f"NA1_{5400000000 + i // 3}",
+                info,
+                participant,
+                FRIENDS[i % len(FRIENDS)],
+                "2026-02-01",
+            )
+        )
+    return rows
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main(sizes):
+    codecs = [
+        ("gzip-1", lambda raw: gzip.compress(raw, compresslevel=1, mtime=0)),
+        ("gzip-6", lambda raw: gzip.compress(raw, compresslevel=6, mtime=0)),
+        ("gzip-9", lambda raw: gzip.compress(raw, compresslevel=9, mtime=0)),
+    ]
+    if brotli is not None:
+        codecs += [
+            ("br-4", lambda raw: brotli.compress(raw, quality=4)),
+            ("br-6", lambda raw: brotli.compress(raw, quality=6)),
+            ("br-11", lambda raw: brotli.compress(raw, quality=11)),
+        ]
+    else:
+        print("(brotli not installed: skipping br)")
+
+    print(
+        f"{'rows':>7} {'codec':>8} {'bytes':>12} {'base64':>12} {'ratio':>7} {'ms':>9}"
+    )
+    for count in sizes:
+        rows = synthetic_rows(count)
+        body, dump_ms = timed(json.dumps, rows, default=str)
+        raw = body.encode("utf-8")
+        over = " (over 6 MB limit)" if len(raw) > LAMBDA_PAYLOAD_LIMIT else ""
+        print(
+            f"{count:>7} {'identity':>8} {len(raw):>12,} {'-':>12} "
+            f"{1:>7.1f} {dump_ms:>9.1f}{over}"
+        )
+        for name, compress in codecs:
+            packed, ms = timed(compress, raw)
+            b64 = len(base64.b64encode(packed))
+            over = " (over 6 MB limit)" if b64 > LAMBDA_PAYLOAD_LIMIT else ""
+            print(
+                f"{count:>7} {name:>8} {len(packed):>12,} {b64:>12,} "
+                f"{len(raw) / len(packed):>7.1f} {ms:>9.1f}{over}"
+            )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
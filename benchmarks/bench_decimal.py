@@ -0,0 +1,63 @@
+"""
+Microbenchmark: preparing a stats row for DynamoDB.
+
+Compares the old JSON round trip (json.loads(json.dumps(row), parse_float=Decimal))
+with match_store.to_dynamodb, which walks the row once and converts float leaves.
+
+Run from the repo root:  python benchmarks/bench_decimal.py
+"""
+
+import json
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+import league_logic  # noqa: E402
+import match_store  # noqa: E402
+
+ROWS = 1000
+
+
+def sample_row(i):
+    participant = {
+        "puuid": f"puuid-{i}",
+        "kills": i % 17,
+        "deaths": i % 9,
+        "assists": i % 23,
+        "championName": "Ahri",
+        "teamPosition": "MIDDLE",
+        "timePlayed": 1800 + i,
+        "win": i % 2 == 0,
+    }
+    info = {"gameMode": "CLASSIC", "gameEndTimestamp": 1768000000000 + i}
+    return league_logic.extract_player_stats(
+        f"NA1_{i}", info, participant, f"Friend{i % 5}#NA1", "2026-01-16"
+    )
+
+
+def json_round_trip(rows):
+    return [json.loads(json.dumps(row), parse_float=Decimal) for row in rows]
+
+
+def direct(rows):
+    return [match_store.to_dynamodb(row) for row in rows]
+
+
+def main():
+    rows = [sample_row(i) for i in range(ROWS)]
+    assert json_round_trip(rows) == direct(rows), "converters disagree"
+
+    for name, fn in (("json round trip", json_round_trip), ("to_dynamodb", direct)):
+        best = min(timeit.repeat(lambda: fn(rows), number=10, repeat=5)) / 10
+        print(
+            f"{name:>16}: {best * 1000:8.2f} ms per {ROWS} rows "
+            f"({best / ROWS * 1e6:6.2f} us/row)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Cold-start import cost per Lambda handler, measured with `python -X importtime`.
+
+Each handler module is imported in a fresh interpreter (so nothing is cached
+in-process) from its build/<handler> directory when build_lambdas.py has been
+run, otherwise straight from backend/. Reports the handler's total import time
+and its most expensive direct and transitive imports, plus what the deferred
+imports (requests, zoneinfo) cost on first use. boto3 must be installed for
+the handlers that import it.
+
+Run from the repo root:  python benchmarks/bench_import_time.py [top_n]
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+BACKEND_DIR = os.path.join(ROOT_DIR, "backend")
+BUILD_DIR = os.path.join(ROOT_DIR, "build")
+
+HANDLERS = {"poller": "lambda_function", "reader": "get_matches"}
+# Imported on first use rather than at cold start
+DEFERRED = ["requests", "zoneinfo"]
+RUNS = 5
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_times(statement, cwd):
+    """
+    Runs `statement` under -X importtime in a fresh interpreter and returns
+    [(module, self_us, cumulative_us, depth)], or raises with its stderr.
+    """
+    env = dict(os.environ)
+    # Handlers create AWS clients at import; they need a region and table, not
+    # credentials
+    env.setdefault("AWS_DEFAULT_REGION", "us-west-1")
+    env.setdefault("TABLE_NAME", "LeagueMatches")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    times = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            times.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return times
+
+
+def best_of(statement, cwd, module):
+    """
+    Lowest cumulative import time of `module` over RUNS fresh interpreters
+    (the minimum filters out disk-cache and scheduler noise), with the modules
+    that run imported on its behalf.
+    """
+    best = None
+    for _ in range(RUNS):
+        times = import_times(statement, cwd)
+        end = next(i for i, t in enumerate(times) if t[0] == module and t[3] == 0)
+        # Children are listed before their parent, indented deeper
+        start = end
+        while start > 0 and times[start - 1][3] > 0:
+            start -= 1
+        if best is None or times[end][2] < best[0]:
+            best = (times[end][2], times[start : end + 1])
+    return best
+
+
+def main(top_n=8):
+    for handler, module in HANDLERS.items():
+        cwd = os.path.join(BUILD_DIR, handler)
+        if not os.path.isdir(cwd):
+            cwd = BACKEND_DIR
+        print(f"\n{handler} ({module}.py from {os.path.relpath(cwd, ROOT_DIR)})")
+        try:
+            total, times = best_of(f"import {module}", cwd, module)
+        except RuntimeError as e:
+            print(f"  could not import: {e}")
+            continue
+        print(f"  total import: {total / 1000:8.1f} ms  ({len(times)} modules)")
+        for name, _, cumulative, depth in sorted(
+            times, key=lambda t: t[2], reverse=True
+        )[1 : top_n + 1]:
+            print(f"  {cumulative / 1000:8.1f} ms  {'  ' * depth}{name}")
+
+    print("\ndeferred imports (paid on first use, not at cold start)")
+    for module in DEFERRED:
+        total, _ = best_of(f"import {module}", BACKEND_DIR, module)
+        print(f"  {total / 1000:8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,99 @@
+"""
+Builds one minimal deployment directory per Lambda handler under build/.
+
+Each handler gets only the backend modules, vendored packages and data files
+it imports (boto3 is provided by the Lambda runtime and never shipped), with
+no .dist-info, __pycache__ or console scripts. Bytecode is precompiled so
+cold starts skip compilation; run this with the Lambda runtime's Python
+(3.9) or the .pyc files are ignored and the sources compiled at import.
+
+Terraform zips build/<handler>/, so run this before `terraform apply`:
+    python build_lambdas.py
+"""
+
+import compileall
+import os
+import py_compile
+import shutil
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(ROOT_DIR, "backend")
+BUILD_DIR = os.path.join(ROOT_DIR, "build")
+LAMBDA_PYTHON = (3, 9)
+
+# What each handler needs from backend/
+HANDLERS = {
+    "poller": {
+        "modules": [
+            "lambda_function",
+            "league_logic",
+            "riot_client",
+            "json_codec",
+            "match_stream",
+            "match_store",
+            "dashboard_stats",
+            "snapshot",
+            "work_ledger",
+            "pipeline",
+        ],
+        "packages": ["requests", "urllib3", "idna", "charset_normalizer", "certifi"],
+        "data": ["friends_config.json", "friends_puuids.json"],
+    },
+    "reader": {
+        "modules": ["get_matches", "match_store", "dashboard_stats"],
+        "packages": [],
+        "data": [],
+    },
+}
+
+IGNORED = shutil.ignore_patterns("__pycache__", "*.pyc", "*.exe")
+
+
+def build_handler(name, spec):
+    target = os.path.join(BUILD_DIR, name)
+    shutil.rmtree(target, ignore_errors=True)
+    os.makedirs(target)
+
+    for module in spec["modules"]:
+        shutil.copy2(os.path.join(BACKEND_DIR, f"{module}.py"), target)
+    for package in spec["packages"]:
+        shutil.copytree(
+            os.path.join(BACKEND_DIR, package),
+            os.path.join(target, package),
+            ignore=IGNORED,
+        )
+    for data_file in spec["data"]:
+        shutil.copy2(os.path.join(BACKEND_DIR, data_file), target)
+
+    # Unchecked hash-based pycs stay valid after Terraform re-zips the files
+    # (zip timestamps would invalidate the default mtime-based ones)
+    compileall.compile_dir(
+        target,
+        quiet=1,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+    return target
+
+
+def dir_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(dirpath, f)) for f in filenames)
+    return total
+
+
+def main():
+    if sys.version_info[:2] != LAMBDA_PYTHON:
+        print(
+            f"WARNING: building with Python {sys.version_info[0]}.{sys.version_info[1]}"
+            f"; Lambda runs {LAMBDA_PYTHON[0]}.{LAMBDA_PYTHON[1]} and will ignore"
+            " these .pyc files"
+        )
+    for name, spec in HANDLERS.items():
+        target = build_handler(name, spec)
+        print(f"{name}: {target} ({dir_size(target) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
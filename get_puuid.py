@@ -1,9 +1,13 @@
 import json
 import os
+import sys
 
-import requests
 from dotenv import load_dotenv
 
+# The Riot client lives with the Lambda code in backend/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from riot_client import RiotClient  # noqa: E402
+
 load_dotenv()
 API_KEY = os.getenv("RIOT_API_KEY")
 
@@ -13,14 +17,13 @@ def load_config():
         return json.load(f)
 
 
-def get_puuid(name, tag, region):
-    url = f"https://{region}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{name}/{tag}"
-    headers = {"X-Riot-Token": API_KEY}
-    print(f"DEBUG: Requesting PUUID for {name}#{tag} from {url}")
-    response = requests.get(url, headers=headers)
+def get_puuid(name, tag, region, client):
+    path = f"/riot/account/v1/accounts/by-riot-id/{name}/{tag}"
+    print(f"DEBUG: Requesting PUUID for {name}#{tag} from {region} {path}")
+    response = client.get(region, path, method="account-v1.byRiotId")
 
     if response.status_code == 200:
-        puuid = response.json().get("puuid")
+        puuid = client.decode_json(response, "account-v1.byRiotId").get("puuid")
         print(f"DEBUG: Found PUUID: {puuid}")
         return puuid
     print(
@@ -33,12 +36,13 @@ def main():
     config = load_config()
     region = config["settings"]["region"]
     puuid_results = {}
+    client = RiotClient(API_KEY)
 
     for friend in config["friends"]:
         name, tag = friend["name"], friend["tag"]
         print(f"Syncing: {name}#{tag}...")
 
-        puuid = get_puuid(name, tag, region)
+        puuid = get_puuid(name, tag, region, client)
         if puuid:
             puuid_results[f"{name}#{tag}"] = puuid
         else:
@@ -15,10 +15,17 @@ locals {
 # ==============================================================================
 # Data Sources
 # ==============================================================================
-data "archive_file" "lambda_zip" {
+# One minimal artifact per handler; run `python build_lambdas.py` first
+data "archive_file" "poller_zip" {
   type        = "zip"
-  source_dir  = "${path.module}/../backend" 
-  output_path = "${path.module}/../deployment.zip" 
+  source_dir  = "${path.module}/../build/poller"
+  output_path = "${path.module}/../build/poller.zip"
+}
+
+data "archive_file" "reader_zip" {
+  type        = "zip"
+  source_dir  = "${path.module}/../build/reader"
+  output_path = "${path.module}/../build/reader.zip"
 }
 
 data "aws_secretsmanager_secret" "riot_dashboard_secret" {
@@ -58,12 +65,18 @@ resource "aws_iam_role_policy" "lambda_main_policy" {
         Effect = "Allow"
         Action = [
           "dynamodb:PutItem",
+          "dynamodb:BatchWriteItem",
           "dynamodb:GetItem",
+          "dynamodb:BatchGetItem",
           "dynamodb:Query",
           "dynamodb:UpdateItem",
+          "dynamodb:DeleteItem",
           "dynamodb:Scan"
         ]
-        Resource = aws_dynamodb_table.league_matches.arn
+        Resource = [
+          aws_dynamodb_table.league_matches.arn,
+          "${aws_dynamodb_table.league_matches.arn}/index/*"
+        ]
       },
       {
         Effect = "Allow"
@@ -73,6 +86,21 @@ resource "aws_iam_role_policy" "lambda_main_policy" {
           "logs:PutLogEvents"
         ]
         Resource = "arn:aws:logs:*:*:*"
+      },
+      {
+        # Poller publishes dashboard snapshots next to index.html
+        Effect = "Allow"
+        Action = [
+          "s3:GetObject",
+          "s3:PutObject"
+        ]
+        Resource = "${aws_s3_bucket.frontend_bucket.arn}/snapshots/*"
+      },
+      {
+        # Lets a missing latest.json come back as NoSuchKey instead of AccessDenied
+        Effect   = "Allow"
+        Action   = "s3:ListBucket"
+        Resource = aws_s3_bucket.frontend_bucket.arn
       }
     ]
   })
@@ -120,6 +148,42 @@ resource "aws_dynamodb_table" "league_matches" {
     type = "S"
   }
 
+  attribute {
+    name = "gameMonth"
+    type = "S"
+  }
+
+  attribute {
+    name = "gameEndTimestamp"
+    type = "N"
+  }
+
+  attribute {
+    name = "savedMonth"
+    type = "S"
+  }
+
+  attribute {
+    name = "savedAt"
+    type = "N"
+  }
+
+  # Date-range reads for the dashboard: one partition per month, newest first
+  global_secondary_index {
+    name            = "ByMonth"
+    hash_key        = "gameMonth"
+    range_key       = "gameEndTimestamp"
+    projection_type = "ALL"
+  }
+
+  # Delta sync (?since=): rows by when they were written, one partition per month
+  global_secondary_index {
+    name            = "BySaved"
+    hash_key        = "savedMonth"
+    range_key       = "savedAt"
+    projection_type = "ALL"
+  }
+
   tags = local.common_tags
 }
 
@@ -130,8 +194,8 @@ resource "aws_dynamodb_table" "league_matches" {
 resource "aws_lambda_function" "league_poller" {
   function_name = "LeagueMatchPoller"
   
-  filename         = data.archive_file.lambda_zip.output_path
-  source_code_hash = data.archive_file.lambda_zip.output_base64sha256
+  filename         = data.archive_file.poller_zip.output_path
+  source_code_hash = data.archive_file.poller_zip.output_base64sha256
 
   handler     = "lambda_function.lambda_handler"
   runtime     = "python3.9"
@@ -141,8 +205,14 @@ resource "aws_lambda_function" "league_poller" {
 
   environment {
     variables = {
-      TABLE_NAME  = aws_dynamodb_table.league_matches.name
-      SECRET_NAME = data.aws_secretsmanager_secret.riot_dashboard_secret.name
+      TABLE_NAME        = aws_dynamodb_table.league_matches.name
+      SECRET_NAME       = data.aws_secretsmanager_secret.riot_dashboard_secret.name
+      RIOT_CACHE_DIR    = "/tmp/riot-cache"
+      # Oldest cache entries are pruned past this; /tmp is 512 MB by default,
+      # so raise ephemeral_storage before raising this
+      RIOT_CACHE_MAX_MB = "256"
+      SNAPSHOT_BUCKET   = aws_s3_bucket.frontend_bucket.id
+      MIN_GAME_DATE     = "2026-01-16" # keep in sync with the reader
     }
   }
 
@@ -153,9 +223,9 @@ resource "aws_lambda_function" "league_poller" {
 resource "aws_lambda_function" "league_dudes_reader" {
   function_name = "LeagueDudesReader"
   
-  # Use the same zip file (it contains both scripts now)
-  filename         = data.archive_file.lambda_zip.output_path
-  source_code_hash = data.archive_file.lambda_zip.output_base64sha256
+  # Reader-only artifact: get_matches and its helpers, no vendored libraries
+  filename         = data.archive_file.reader_zip.output_path
+  source_code_hash = data.archive_file.reader_zip.output_base64sha256
 
   handler     = "get_matches.lambda_handler" 
   runtime     = "python3.9"
@@ -164,8 +234,10 @@ resource "aws_lambda_function" "league_dudes_reader" {
 
   environment {
     variables = {
-      TABLE_NAME = aws_dynamodb_table.league_matches.name
-      MIN_GAME_DATE = "2026-01-16" # can change here or in AWS console
+      TABLE_NAME       = aws_dynamodb_table.league_matches.name
+      MATCH_INDEX_NAME = "ByMonth"
+      SAVED_INDEX_NAME = "BySaved"
+      MIN_GAME_DATE    = "2026-01-16" # can change here or in AWS console
     }
   }
 
@@ -246,6 +318,13 @@ resource "aws_apigatewayv2_route" "league_dudes_get_matches" {
   target    = "integrations/${aws_apigatewayv2_integration.league_dudes_reader_integration.id}"
 }
 
+# Dashboard aggregates, served by the same reader Lambda
+resource "aws_apigatewayv2_route" "league_dudes_get_summary" {
+  api_id    = aws_apigatewayv2_api.league_dudes_api.id
+  route_key = "GET /summary"
+  target    = "integrations/${aws_apigatewayv2_integration.league_dudes_reader_integration.id}"
+}
+
 # Permission (Allow API Gateway to call Lambda)
 resource "aws_lambda_permission" "league_dudes_api_gw_permission" {
   statement_id  = "AllowExecutionFromAPIGateway"
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The Lambda modules import each other flat, as they do in the deployed zip
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+)
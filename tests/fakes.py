@@ -0,0 +1,214 @@
+"""
+In-memory stand-ins for the Riot API and the LeagueMatches table.
+"""
+
+import copy
+import json
+import operator
+import threading
+
+from riot_client import RateLimiter, RiotClient
+
+# Generous enough that the rate limiter never sleeps in a test
+LIMIT_HEADERS = {
+    "X-App-Rate-Limit": "100000:1",
+    "X-App-Rate-Limit-Count": "1:1",
+    "X-Method-Rate-Limit": "100000:1",
+    "X-Method-Rate-Limit-Count": "1:1",
+    "Content-Type": "application/json;charset=utf-8",
+}
+
+
+class FakeResponse:
+    def __init__(self, status_code, body, chunk_size=1024):
+        self.status_code = status_code
+        self.content = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.text = self.content.decode("utf-8")
+        self.headers = dict(LIMIT_HEADERS)
+        self.chunk_size = chunk_size
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        for i in range(0, len(self.content), self.chunk_size):
+            yield self.content[i : i + self.chunk_size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def make_match(match_id, puuids, game_end=1768000000000):
+    participants = [
+        {
+            "puuid": puuids[i] if i < len(puuids) else f"other-{i}",
+            "kills": 3,
+            "deaths": 2,
+            "assists": 4,
+            "win": True,
+            "championName": "Ahri",
+            "teamPosition": "MIDDLE",
+            "timePlayed": 1800,
+            "totalDamageDealtToChampions": 20000,
+            "visionScore": 20,
+        }
+        for i in range(10)
+    ]
+    return {
+        "metadata": {"matchId": match_id},
+        "info": {
+            "gameCreation": game_end - 1800000,
+            "gameEndTimestamp": game_end,
+            "gameMode": "CLASSIC",
+            "participants": participants,
+        },
+    }
+
+
+class FakeRiot:
+    """
+    Serves match-v5 ids and match documents. `ids` maps puuid -> match IDs,
+    newest first; `matches` maps match ID -> document. Match IDs and puuids
+    in `broken` always answer 404. Every request path is appended to `calls`.
+    """
+
+    def __init__(self, ids, matches, broken=()):
+        self.ids = ids
+        self.matches = matches
+        self.broken = set(broken)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def client(self, **kwargs):
+        client = RiotClient("test-key", rate_limiter=RateLimiter("100000:1"), **kwargs)
+        client.session.get = self.get
+        return client
+
+    def match_calls(self):
+        return [path for path in self.calls if "/ids" not in path]
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        path = url.split(".api.riotgames.com", 1)[1]
+        with self._lock:
+            self.calls.append(path)
+        params = params or {}
+        if "/by-puuid/" in path:
+            puuid = path.split("/by-puuid/")[1].split("/")[0]
+            if puuid in self.broken:
+                return FakeResponse(404, {"status": {"status_code": 404}})
+            ids = [
+                mid
+                for mid in self.ids.get(puuid, [])
+                if params.get("startTime", 0) * 1000
+                <= self.matches[mid]["info"]["gameEndTimestamp"]
+                and (
+                    "endTime" not in params
+                    or self.matches[mid]["info"]["gameEndTimestamp"]
+                    <= params["endTime"] * 1000
+                )
+            ]
+            start = params.get("start", 0)
+            return FakeResponse(200, ids[start : start + params["count"]])
+        match_id = path.rsplit("/", 1)[1]
+        if match_id in self.broken or match_id not in self.matches:
+            return FakeResponse(404, {"status": {"status_code": 404}})
+        return FakeResponse(200, self.matches[match_id])
+
+
+INDEX_SORT_KEYS = {"ByMonth": "gameEndTimestamp", "BySaved": "savedAt"}
+_OPERATORS = {
+    "=": operator.eq,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def _matches(condition, item):
+    # Evaluates the boto3 Key/Attr conditions match_store builds
+    expression = condition.get_expression()
+    values = expression["values"]
+    if expression["operator"] == "AND":
+        return all(_matches(value, item) for value in values)
+    name, value = values[0].name, values[1]
+    return name in item and _OPERATORS[expression["operator"]](item[name], value)
+
+
+class _Meta:
+    def __init__(self, client):
+        self.client = client
+
+
+class MemoryTable:
+    """
+    The parts of a boto3 Table (and its client's batch calls) the poller uses.
+    """
+
+    name = "LeagueMatches"
+
+    def __init__(self):
+        self.items = {}
+        self.meta = _Meta(self)
+
+    def rows(self):
+        return {key for key in self.items if not key[0].startswith("#")}
+
+    def get_item(self, Key, **kwargs):
+        item = self.items.get((Key["matchId"], Key["puuid"]))
+        return {"Item": copy.deepcopy(item)} if item else {}
+
+    def put_item(self, Item):
+        self.items[(Item["matchId"], Item["puuid"])] = copy.deepcopy(Item)
+
+    def delete_item(self, Key):
+        self.items.pop((Key["matchId"], Key["puuid"]), None)
+
+    def update_item(self, Key, **kwargs):
+        # Only the dataset version counter is updated in place
+        item = self.items.setdefault((Key["matchId"], Key["puuid"]), dict(Key))
+        item["datasetVersion"] = item.get("datasetVersion", 0) + 1
+        return {"Attributes": {"datasetVersion": item["datasetVersion"]}}
+
+    def query(self, IndexName, KeyConditionExpression, **kwargs):
+        # Whole items in one response: no projection, Limit or paging. Like
+        # DynamoDB, overlapping projection paths are rejected.
+        if "ProjectionExpression" in kwargs:
+            names = kwargs["ExpressionAttributeNames"]
+            paths = [
+                ".".join(names[part] for part in path.split("."))
+                for path in kwargs["ProjectionExpression"].split(", ")
+            ]
+            if any(a.startswith(f"{b}.") for a in paths for b in paths):
+                raise ValueError("Two document paths overlap")
+        sort_key = INDEX_SORT_KEYS[IndexName]
+        conditions = [KeyConditionExpression, kwargs.get("FilterExpression")]
+        items = [
+            copy.deepcopy(item)
+            for key, item in self.items.items()
+            if not key[0].startswith("#")
+            and all(_matches(c, item) for c in conditions if c is not None)
+        ]
+        items.sort(
+            key=lambda item: item[sort_key],
+            reverse=not kwargs.get("ScanIndexForward", True),
+        )
+        return {"Items": items}
+
+    def batch_get_item(self, RequestItems):
+        ((name, request),) = RequestItems.items()
+        found = [
+            copy.deepcopy(self.items[(key["matchId"], key["puuid"])])
+            for key in request["Keys"]
+            if (key["matchId"], key["puuid"]) in self.items
+        ]
+        return {"Responses": {name: found}}
+
+    def batch_write_item(self, RequestItems):
+        ((name, requests),) = RequestItems.items()
+        for request in requests:
+            self.put_item(request["PutRequest"]["Item"])
+        return {}
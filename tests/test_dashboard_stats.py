@@ -0,0 +1,113 @@
+import json
+from decimal import Decimal
+
+from dashboard_stats import compute_summary
+
+
+def row(match_id, name, mode="CLASSIC", win=True, end=1, seconds=1800, **stats):
+    return {
+        "matchId": match_id,
+        "puuid": name.lower(),
+        "friendName": name,
+        "metadata": {
+            "gameEndTimeStamp": end,
+            "gameMode": mode,
+            "win": win,
+            "timePlayed": seconds,
+            "teamPosition": stats.pop("position", "MIDDLE"),
+            "championName": stats.pop("champion", "Ahri"),
+        },
+        "combat": {
+            "kills": stats.pop("kills", 0),
+            "totalDamageDealtToChampions": stats.pop("damage", 0),
+            "goldEarned": stats.pop("gold", 0),
+        },
+        "objectives": {},
+        "vision_and_social": {"pings": stats.pop("pings", {})},
+    }
+
+
+def test_match_totals_count_each_match_once():
+    summary = compute_summary(
+        [
+            row("M1", "Ann", win=True, seconds=1500),
+            row("M1", "Bo", win=True, seconds=1500),
+            row("M2", "Ann", mode="ARAM", win=False, seconds=1200),
+            row("M3", "Bo", win=False, seconds=2100),
+        ]
+    )
+
+    assert summary["totals"] == {
+        "regsMatches": 2,
+        "regsWins": 1,
+        "aramMatches": 1,
+        "aramWins": 0,
+        "totalSeconds": 4800,
+        "longestGame": 2100,
+    }
+    assert {f["name"]: f["games"] for f in summary["leaderboards"]["kills"]} == {
+        "Ann": 2,
+        "Bo": 2,
+    }
+
+
+def test_leaderboards_rank_friend_totals_and_keep_the_top_five():
+    rows = [row(f"M{i}", f"F{i}", kills=i, damage=100 - i) for i in range(7)]
+    rows.append(row("M9", "F1", kills=10))
+
+    boards = compute_summary(rows)["leaderboards"]
+
+    assert [f["name"] for f in boards["kills"]] == ["F1", "F6", "F5", "F4", "F3"]
+    assert boards["kills"][0]["kills"] == 11
+    assert [f["name"] for f in boards["damage"]] == ["F0", "F1", "F2", "F3", "F4"]
+
+
+def test_role_preference_counts_summoners_rift_games_only():
+    summary = compute_summary(
+        [
+            row("M1", "Ann", position="TOP"),
+            row("M2", "Ann", position="TOP"),
+            row("M3", "Ann", mode="ARAM", position="MIDDLE"),
+            row("M4", "Bo", mode="ARAM", position="UTILITY"),
+        ]
+    )
+
+    assert summary["positions"] == {
+        "Ann": {"TOP": 2, "JUNGLE": 0, "MIDDLE": 0, "BOTTOM": 0, "UTILITY": 0}
+    }
+
+
+def test_decimal_inputs_from_dynamodb_come_out_as_plain_numbers():
+    rows = [
+        row(
+            "M1",
+            "Ann",
+            end=Decimal("1768000000000"),
+            seconds=Decimal("1800"),
+            kills=Decimal("7"),
+            gold=Decimal("10500.5"),
+            pings={"allIn": Decimal("2"), "onMyWay": Decimal("0")},
+        )
+    ]
+
+    summary = compute_summary(rows)
+    ann = summary["leaderboards"]["kills"][0]
+
+    assert summary["latestGameEnd"] == 1768000000000
+    assert ann["kills"] == 7 and type(ann["kills"]) is int
+    assert ann["gold"] == 10500.5
+    assert ann["pingTypes"] == {"allIn": 2}
+    # Nothing left that json can't serialize
+    json.dumps(summary)
+
+
+def test_charts_follow_match_order_not_row_order():
+    charts = compute_summary(
+        [
+            row("M2", "Ann", win=False, end=2, gold=5),
+            row("M1", "Ann", win=True, end=1, gold=10),
+        ]
+    )["charts"]
+
+    assert charts["winRate"] == [100.0, 50.0]
+    assert charts["gold"] == {"Ann": [10, 15]}
@@ -0,0 +1,53 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("boto3")
+os.environ.setdefault("TABLE_NAME", "LeagueMatches")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-1")
+get_matches = pytest.importorskip("get_matches")
+
+import league_logic  # noqa: E402
+from fakes import FakeRiot, MemoryTable, make_match  # noqa: E402
+
+FRIENDS = {"A#NA1": "pa"}
+CONFIG = {"settings": {"match_count": 5}}
+
+
+def delta(since):
+    return json.loads(get_matches.build_delta("2026-01-01", since))
+
+
+def test_late_written_older_game_reaches_synced_clients(monkeypatch):
+    table = MemoryTable()
+    monkeypatch.setattr(get_matches, "table", table)
+    old = make_match("NA1_1", ["pa"], 1768000000000)
+    new = make_match("NA1_2", ["pa"], 1768100000000)
+    fake = FakeRiot({"pa": ["NA1_2"]}, {"NA1_1": old, "NA1_2": new})
+    client = fake.client()
+
+    assert league_logic.process_matches(FRIENDS, CONFIG, client, table) == 1
+    first = delta(0)
+    assert [item["matchId"] for item in first["items"]] == ["NA1_2"]
+
+    # A backfill then saves a game that ended before the one the client holds
+    fake.ids["pa"].append("NA1_1")
+    assert (
+        league_logic.process_matches(
+            FRIENDS, CONFIG, client, table, backfill_since="2026-01-01"
+        )
+        == 1
+    )
+    second = delta(first["since"])
+    assert "NA1_1" in [item["matchId"] for item in second["items"]]
+    assert second["since"] >= first["since"]
+
+
+def test_cursor_stays_behind_writes_that_may_still_be_landing(monkeypatch):
+    monkeypatch.setattr(get_matches.time, "time", lambda: 1000.0)
+    settled = 1000 * 1000 - get_matches.DELTA_SETTLE_MS
+
+    assert get_matches.sync_cursor(5, [{"savedAt": settled - 1}]) == settled - 1
+    assert get_matches.sync_cursor(5, [{"savedAt": settled + 1}]) == settled
+    assert get_matches.sync_cursor(settled + 7, []) == settled + 7
@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+pytest.importorskip("boto3")
+os.environ.setdefault("TABLE_NAME", "LeagueMatches")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-1")
+get_matches = pytest.importorskip("get_matches")
+
+from fakes import MemoryTable  # noqa: E402
+
+
+def overlapping(fields):
+    return [a for a in fields for b in fields if a.startswith(f"{b}.")]
+
+
+@pytest.mark.parametrize(
+    "value, kept, dropped",
+    [
+        ("dashboard,combat", "combat", "combat.kills"),
+        ("metadata,metadata.win", "metadata", "metadata.win"),
+        ("metadata.win,metadata", "metadata", "metadata.win"),
+    ],
+)
+def test_paths_under_a_requested_path_are_dropped(value, kept, dropped):
+    fields = get_matches.parse_fields(value)
+    assert kept in fields and dropped not in fields
+    assert overlapping(fields) == []
+
+
+def test_prefix_that_is_not_a_parent_is_kept():
+    fields = get_matches.parse_fields("meta,metadata.win")
+    assert "meta" in fields and "metadata.win" in fields
+
+
+def test_overlapping_fields_are_served(monkeypatch):
+    monkeypatch.setattr(get_matches, "table", MemoryTable())
+    get_matches.response_cache.clear()
+    event = {
+        "routeKey": "GET /matches",
+        "queryStringParameters": {"fields": "dashboard,combat"},
+    }
+    assert get_matches.lambda_handler(event, None)["statusCode"] == 200
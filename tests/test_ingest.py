@@ -0,0 +1,209 @@
+import league_logic
+import work_ledger
+from fakes import FakeRiot, MemoryTable, make_match
+from riot_client import Deadline, RateLimiter
+
+FRIENDS = {"A#NA1": "pa"}
+CONFIG = {"settings": {"match_count": 5, "fetch_concurrency": 2}}
+
+
+def game(mid, game_end):
+    return make_match(mid, ["pa"], game_end)
+
+
+class CallBudget(Deadline):
+    """
+    A deadline that expires once the fake has answered `calls` requests
+    (only match requests if matches_only), so a run stops at a known point.
+    """
+
+    def __init__(self, fake, calls, matches_only=False):
+        self.fake = fake
+        self.calls = calls
+        self.matches_only = matches_only
+
+    def remaining(self):
+        made = self.fake.match_calls() if self.matches_only else self.fake.calls
+        return 60.0 if len(made) < self.calls else 0.0
+
+
+def test_deadline_leaves_unfetched_matches_pending():
+    ids = ["NA1_3", "NA1_2", "NA1_1"]
+    matches = {mid: game(mid, 1768000000000 + i) for i, mid in enumerate(ids)}
+    fake = FakeRiot({"pa": ids}, matches)
+    client = fake.client()
+    table = MemoryTable()
+    ledger = work_ledger.DynamoLedger(table)
+    config = {"settings": {"match_count": 5, "fetch_concurrency": 1}}
+
+    client.set_deadline(CallBudget(fake, 1, matches_only=True))
+    assert league_logic.process_matches(FRIENDS, config, client, table, ledger) == 1
+    state = ledger.load()
+    assert len(state["pending"]) == 2
+    # Never tried, so no attempt is used up
+    assert state["attempts"] == {}
+    # The saved game doesn't move the mark past the two left behind
+    assert ("#watermark", "pa") not in table.items
+
+    client.set_deadline(None)
+    assert league_logic.process_matches(FRIENDS, config, client, table, ledger) == 2
+    assert {mid for mid, _ in table.rows()} == set(ids)
+    assert len(fake.match_calls()) == 3
+    assert (work_ledger.LEDGER_MATCH_ID, "poll") not in table.items
+    assert table.items[("#watermark", "pa")]["lastGameEnd"] == 1768000000000 + 2
+
+
+def test_rate_limit_wait_past_the_deadline_uses_no_attempt():
+    fake = FakeRiot({"pa": ["NA1_1"]}, {"NA1_1": game("NA1_1", 1768000000000)})
+    client = fake.client()
+    table = MemoryTable()
+    ledger = work_ledger.DynamoLedger(table)
+    ledger.save({**work_ledger.empty_state(), "pending": {"NA1_1": ["pa"]}})
+    client.set_deadline(CallBudget(fake, 1000))
+    # Every request would have to wait longer than the deadline allows
+    client.rate_limiter.penalize(
+        "americas", "any", {"Retry-After": "120", "X-Rate-Limit-Type": "application"}
+    )
+
+    for _ in range(league_logic.MAX_MATCH_ATTEMPTS + 1):
+        assert league_logic.process_matches(FRIENDS, CONFIG, client, table, ledger) == 0
+    state = ledger.load()
+    assert state["pending"] == {"NA1_1": ["pa"]}
+    assert state["attempts"] == {} and state["parked"] == []
+    assert fake.calls == []
+
+    client.rate_limiter = RateLimiter("100000:1")
+    assert league_logic.process_matches(FRIENDS, CONFIG, client, table, ledger) == 1
+    assert ("NA1_1", "pa") in table.rows()
+
+
+def test_unlisted_friend_keeps_their_mark():
+    shared = make_match("NA1_2", ["pa", "pb"], 1768002000000)
+    solo = make_match("NA1_1", ["pb"], 1768001000000)
+    fake = FakeRiot(
+        {"pa": ["NA1_2"], "pb": ["NA1_2", "NA1_1"]},
+        {"NA1_2": shared, "NA1_1": solo},
+        broken={"pb"},
+    )
+    client = fake.client()
+    table = MemoryTable()
+    friends = {"A#NA1": "pa", "B#NA1": "pb"}
+
+    # B's listing fails, but the game A listed is saved for both of them
+    assert league_logic.process_matches(friends, CONFIG, client, table) == 2
+    assert ("#watermark", "pa") in table.items
+    assert ("#watermark", "pb") not in table.items
+
+    fake.broken.clear()
+    assert league_logic.process_matches(friends, CONFIG, client, table) == 1
+    assert ("NA1_1", "pb") in table.rows()
+
+
+def test_backfill_resumes_with_the_windows_not_yet_listed(tmp_path):
+    fake = FakeRiot({"pa": ["NA1_1"]}, {"NA1_1": game("NA1_1", 1768000000000)})
+    client = fake.client()
+    table = MemoryTable()
+    ledger = work_ledger.FileLedger(str(tmp_path / "ledger.json"))
+    config = {"settings": {"discover_concurrency": 1}}
+    windows = league_logic.backfill_windows("2026-01-01", 30)
+
+    def run():
+        return league_logic.process_matches(
+            FRIENDS, config, client, table, ledger, backfill_since="2026-01-01"
+        )
+
+    client.set_deadline(CallBudget(fake, 2))
+    assert run() == 0
+    cursor = ledger.load()["cursors"]["pa"]
+    assert len(cursor["windows"]) == 2
+
+    client.set_deadline(None)
+    assert run() == 1
+    assert not (tmp_path / "ledger.json").exists()
+    # Each window was listed exactly once across both runs
+    assert len(fake.calls) - len(fake.match_calls()) == len(windows)
+
+
+def test_match_failing_every_run_is_parked(tmp_path):
+    matches = {
+        "NA1_1": game("NA1_1", 1768000000000),
+        "NA1_2": game("NA1_2", 1768001000000),
+        "NA1_3": game("NA1_3", 1768002000000),
+        "NA1_4": game("NA1_4", 1768003000000),
+    }
+    fake = FakeRiot({"pa": ["NA1_2", "NA1_1"]}, matches, broken={"NA1_2"})
+    client = fake.client()
+    table = MemoryTable()
+    ledger = work_ledger.FileLedger(str(tmp_path / "ledger.json"))
+
+    def run():
+        return league_logic.process_matches(FRIENDS, CONFIG, client, table, ledger)
+
+    assert run() == 1
+    assert ledger.load()["attempts"] == {"NA1_2": 1}
+
+    # The friend is listed again although their listing finished last run
+    fake.ids["pa"].insert(0, "NA1_3")
+    assert run() == 1
+    assert ("NA1_3", "pa") in table.rows()
+    assert ledger.load()["attempts"] == {"NA1_2": 2}
+
+    assert run() == 0
+    state = ledger.load()
+    assert state["pending"] == {} and state["parked"] == ["NA1_2"]
+
+    # No longer holding back the mark: the next saved game moves it past the
+    # parked one, which then drops out of the listing and the ledger closes
+    fake.ids["pa"].insert(0, "NA1_4")
+    assert run() == 1
+    assert ledger.load()["parked"] == ["NA1_2"]
+    assert run() == 0
+    assert not (tmp_path / "ledger.json").exists()
+    assert fake.match_calls().count("/lol/match/v5/matches/NA1_2") == 3
+
+
+def test_backfill_ledger_closes_once_a_failing_match_is_parked(tmp_path):
+    matches = {
+        "NA1_1": game("NA1_1", 1768000000000),
+        "NA1_2": game("NA1_2", 1768001000000),
+    }
+    fake = FakeRiot({"pa": ["NA1_2", "NA1_1"]}, matches, broken={"NA1_2"})
+    client = fake.client()
+    table = MemoryTable()
+    ledger = work_ledger.FileLedger(str(tmp_path / "ledger.json"))
+
+    def run():
+        return league_logic.process_matches(
+            FRIENDS, CONFIG, client, table, ledger, backfill_since="2026-01-01"
+        )
+
+    assert run() == 1
+    listings = len(fake.calls) - len(fake.match_calls())
+    assert run() == 0
+    assert ledger.load()["attempts"] == {"NA1_2": 2}
+    assert run() == 0
+    assert not (tmp_path / "ledger.json").exists()
+    # The finished windows were not listed again while the match was retried
+    assert len(fake.calls) - len(fake.match_calls()) == listings
+
+
+def test_backfill_windows_are_anchored_at_the_since_date():
+    day = 86400
+    start = 1767225600  # 2026-01-01T00:00:00Z
+    now = start + 25 * day + 3600
+
+    windows = league_logic.backfill_windows("2026-01-01", 10, now=now)
+
+    # Newest first, the last one cut at now
+    assert windows == [
+        (start + 20 * day, now),
+        (start + 10 * day, start + 20 * day),
+        (start, start + 10 * day),
+    ]
+    # A later run keeps the start times already recorded as done
+    later = league_logic.backfill_windows("2026-01-01", 10, now=now + 10 * day)
+    assert [w[0] for w in later[1:]] == [w[0] for w in windows]
+
+
+def test_no_backfill_windows_before_the_since_date():
+    assert league_logic.backfill_windows("2026-01-01", 30, now=1767225600) == []
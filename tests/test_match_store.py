@@ -0,0 +1,85 @@
+import datetime
+import json
+from decimal import Decimal
+
+import pytest
+
+import match_store
+from fakes import MemoryTable
+
+ROW = {
+    "matchId": "NA1_1",
+    "metadata": {"win": True, "timePlayed": 1800, "gameMode": "CLASSIC"},
+    "combat": {"kda": 3.5, "killParticipation": 0.1, "multikills": {"penta": 0}},
+    "challenges": [0.3333333333333333, 2, None, "x", {"ratio": 1e-07}],
+}
+
+
+def test_float_leaves_become_decimals_like_json_parse_float():
+    converted = match_store.to_dynamodb(ROW)
+
+    assert converted == json.loads(json.dumps(ROW), parse_float=Decimal)
+    assert converted["combat"]["kda"] == Decimal("3.5")
+    assert converted["challenges"][4]["ratio"] == Decimal("1e-07")
+
+
+def test_other_values_are_kept_and_the_row_is_not_modified():
+    converted = match_store.to_dynamodb(ROW)
+
+    assert converted["metadata"] == ROW["metadata"]
+    assert converted["metadata"]["win"] is True
+    assert converted["challenges"][1:4] == [2, None, "x"]
+    assert isinstance(ROW["combat"]["kda"], float)
+    assert converted["combat"] is not ROW["combat"]
+
+
+def test_months_between_runs_newest_first_across_years():
+    today = datetime.date(2026, 2, 3)
+
+    assert match_store.months_between("2025-11-20", today) == [
+        "2026-02",
+        "2026-01",
+        "2025-12",
+        "2025-11",
+    ]
+    assert match_store.months_between("2026-02-28", today) == ["2026-02"]
+    assert match_store.months_between("2026-03-01", today) == []
+
+
+def game_row(match_id, game_date, game_end):
+    return {
+        "matchId": match_id,
+        "puuid": "pa",
+        "gameDate": game_date,
+        "gameMonth": game_date[:7],
+        "gameEndTimestamp": game_end,
+    }
+
+
+def test_load_rows_reads_each_bucket_from_min_date_newest_first():
+    pytest.importorskip("boto3")
+    table = MemoryTable()
+    for row in (
+        game_row("NA1_1", "2025-12-30", 1),
+        game_row("NA1_2", "2026-01-10", 2),
+        game_row("NA1_3", "2026-01-20", 3),
+        game_row("NA1_4", "2026-01-25", 4),
+        game_row("NA1_5", "2026-02-02", 5),
+    ):
+        table.put_item(row)
+
+    rows = match_store.load_rows(table, "ByMonth", "2026-01-16")
+
+    # NA1_2 shares the boundary month but is before min_date
+    assert [row["matchId"] for row in rows] == ["NA1_5", "NA1_4", "NA1_3"]
+
+
+def test_only_the_boundary_month_is_filtered_by_date():
+    pytest.importorskip("boto3")
+
+    assert "FilterExpression" in match_store.month_query(
+        "ByMonth", "2026-01", "2026-01-16"
+    )
+    assert "FilterExpression" not in match_store.month_query(
+        "ByMonth", "2026-02", "2026-01-16"
+    )
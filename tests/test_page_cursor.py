@@ -0,0 +1,58 @@
+import base64
+import json
+import os
+
+import pytest
+
+pytest.importorskip("boto3")
+# Read at import; no table is touched by these tests
+os.environ.setdefault("TABLE_NAME", "LeagueMatches")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-1")
+get_matches = pytest.importorskip("get_matches")
+
+KEY = {
+    "matchId": "NA1_1",
+    "puuid": "pa",
+    "gameMonth": "2026-01",
+    "gameEndTimestamp": 1768000000000,
+}
+
+
+def raw_cursor(state):
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+def test_round_trip():
+    for key in (None, KEY):
+        cursor = get_matches.encode_cursor("2026-01", key)
+        assert get_matches.decode_cursor(cursor) == ("2026-01", key)
+
+
+@pytest.mark.parametrize(
+    "state",
+    [
+        {"month": 202601, "key": None},
+        {"month": "2026-13", "key": None},
+        {"month": "2026-01", "key": "NA1_1"},
+        {"month": "2026-01", "key": {"matchId": "NA1_1"}},
+        {"month": "2026-01", "key": {**KEY, "extra": 1}},
+        {"month": "2026-01", "key": {**KEY, "gameMonth": "2025-12"}},
+        {"month": "2026-01", "key": {**KEY, "gameEndTimestamp": "1768000000000"}},
+        {"month": "2026-01"},
+        [1, 2],
+    ],
+)
+def test_rejects_malformed_state(state):
+    with pytest.raises(ValueError):
+        get_matches.decode_cursor(raw_cursor(state))
+
+
+def test_handler_answers_400():
+    response = get_matches.lambda_handler(
+        {
+            "routeKey": "GET /matches",
+            "queryStringParameters": {"cursor": raw_cursor({"month": 1, "key": 2})},
+        },
+        None,
+    )
+    assert response["statusCode"] == 400
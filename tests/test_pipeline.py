@@ -0,0 +1,77 @@
+import itertools
+import threading
+import time
+
+import pipeline
+from pipeline import Pipeline, Stage
+
+
+def test_stages_run_in_order_and_finish_after_their_last_item():
+    events = []
+    lock = threading.Lock()
+
+    def record(event):
+        with lock:
+            events.append(event)
+
+    def double(n):
+        if n == 3:
+            raise ValueError("bad item")
+        return [n * 2]
+
+    def first_finish():
+        record("finish double")
+        return [100]
+
+    def second_finish():
+        record("finish add")
+        return ["flushed"]
+
+    stages = Pipeline(
+        [
+            Stage(
+                "double",
+                double,
+                workers=3,
+                finish=first_finish,
+                on_error=lambda item, e: record(("error", item, str(e))),
+            ),
+            Stage("add", lambda n: [n + 1], finish=second_finish),
+        ]
+    )
+
+    outputs = list(stages.run(range(6)))
+
+    assert sorted(outputs[:-1]) == [1, 3, 5, 9, 11, 101]
+    assert outputs[-1] == "flushed"
+    assert events == [("error", 3, "bad item"), "finish double", "finish add"]
+    assert [s.errors for s in stages.stats] == [1, 0]
+
+
+def test_source_failure_still_closes_the_pipeline():
+    def source():
+        yield 1
+        raise RuntimeError("listing failed")
+
+    assert list(Pipeline([Stage("same", lambda n: [n])]).run(source())) == [1]
+
+
+def test_consumer_stopping_early_shuts_every_stage_down():
+    before = threading.active_count()
+    stages = Pipeline(
+        [
+            Stage("same", lambda n: [n], workers=4, queue_size=2),
+            Stage("fan out", lambda n: [n] * 3, workers=2, queue_size=2),
+        ]
+    )
+
+    run = stages.run(itertools.count())
+    for _ in range(5):
+        next(run)
+    start = time.monotonic()
+    run.close()
+
+    # Every thread was blocked on a full queue; each notices the stop at its
+    # next poll
+    assert time.monotonic() - start < 10 * pipeline.POLL_SECONDS
+    assert threading.active_count() == before
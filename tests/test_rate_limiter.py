@@ -0,0 +1,122 @@
+import pytest
+
+import riot_client
+from fakes import FakeResponse
+from riot_client import RateLimiter, RiotClient, TokenBucket
+
+
+class Clock:
+    """
+    Stands in for time.monotonic/time.sleep: sleeping just moves the clock.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(riot_client.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(riot_client.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_bucket_holds_back_the_safety_margin_and_refills_per_window():
+    bucket = TokenBucket(20, 1, safety_margin=0.05)
+    assert bucket.capacity == 19
+
+    for _ in range(19):
+        assert bucket.wait_time(10.0) == 0
+        bucket.consume(10.0)
+    assert bucket.wait_time(10.25) == pytest.approx(0.75)
+    assert bucket.wait_time(11.0) == 0
+
+
+def test_acquire_paces_requests_to_the_tightest_window(clock):
+    limiter = RateLimiter("5:1,8:10", safety_margin=0)
+
+    for _ in range(8):
+        limiter.acquire("americas", "match")
+
+    # The sixth waits out the 1 s window
+    assert clock.slept == [pytest.approx(1.0)]
+    # The ninth waits for the 10 s window, which started with the first
+    limiter.acquire("americas", "match")
+    assert clock.slept == [pytest.approx(1.0), pytest.approx(9.0)]
+
+
+def test_response_headers_replace_limits_and_sync_counts(clock):
+    limiter = RateLimiter("100:1", safety_margin=0)
+    limiter.acquire("americas", "match")
+    limiter.update(
+        "americas",
+        "match",
+        {
+            "X-App-Rate-Limit": "100:1",
+            "X-App-Rate-Limit-Count": "100:1",
+            "X-Method-Rate-Limit": "50:10",
+            "X-Method-Rate-Limit-Count": "1:10",
+        },
+    )
+
+    # Another process used the rest of the app window
+    limiter.acquire("americas", "match")
+    assert clock.slept == [pytest.approx(1.0)]
+
+
+def test_429_is_waited_out_for_the_scope_riot_names(clock):
+    limiter = RateLimiter("100:1", safety_margin=0)
+    limiter.penalize(
+        "americas", "match", {"Retry-After": "4", "X-Rate-Limit-Type": "method"}
+    )
+
+    limiter.acquire("americas", "ids")
+    assert clock.slept == []
+    limiter.acquire("americas", "match")
+    assert clock.slept == [pytest.approx(4.0)]
+
+
+def rate_limited(times, retry_after="2"):
+    responses = [FakeResponse(429, {}) for _ in range(times)]
+    for response in responses:
+        response.headers.update(
+            {"Retry-After": retry_after, "X-Rate-Limit-Type": "application"}
+        )
+    responses.append(FakeResponse(200, ["NA1_1"]))
+    calls = []
+
+    def get(url, params=None, timeout=None, stream=False):
+        calls.append(url)
+        return responses[len(calls) - 1]
+
+    return get, calls
+
+
+def test_client_retries_429s_after_retry_after(clock):
+    client = RiotClient("key", rate_limiter=RateLimiter("100000:1"))
+    client.session.get, calls = rate_limited(2)
+
+    response = client.get("americas", "/lol/match/v5/matches/by-puuid/pa/ids")
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert clock.slept == [pytest.approx(2.0), pytest.approx(2.0)]
+
+
+def test_client_gives_up_after_max_retries(clock):
+    client = RiotClient("key", rate_limiter=RateLimiter("100000:1"), max_retries=1)
+    client.session.get, calls = rate_limited(3)
+
+    response = client.get("americas", "/lol/match/v5/matches/by-puuid/pa/ids")
+
+    assert response.status_code == 429
+    assert len(calls) == 2
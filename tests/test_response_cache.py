@@ -0,0 +1,35 @@
+import os
+
+import riot_client
+from riot_client import CACHE_FOREVER, ResponseCache
+
+
+def test_store_and_load(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.store("americas/a", b'{"a": 1}')
+    assert cache.load("americas/a", CACHE_FOREVER) == b'{"a": 1}'
+    assert cache.load("americas/b", CACHE_FOREVER) is None
+
+
+def test_prunes_oldest_entries_past_the_cap(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=10_000)
+    for i in range(20):
+        cache.store(f"k{i}", os.urandom(1000))  # incompressible, ~1 KB on disk
+        path = cache._file(f"k{i}")
+        os.utime(path, (i, i))  # strictly increasing ages
+
+    total = sum(f.stat().st_size for f in tmp_path.iterdir())
+    assert total <= 10_000
+    assert cache.load("k19", CACHE_FOREVER) is not None
+    assert cache.load("k0", CACHE_FOREVER) is None
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path))
+
+    def full_disk(src, dst):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(riot_client.os, "replace", full_disk)
+    cache.store("k", b"x" * 100)
+    assert list(tmp_path.iterdir()) == []
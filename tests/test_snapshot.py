@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+pytest.importorskip("boto3")
+import match_store  # noqa: E402
+import snapshot  # noqa: E402
+from fakes import MemoryTable  # noqa: E402
+
+
+class FlakyPublisher(snapshot.LocalPublisher):
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.fail = False
+
+    def write(self, name, body, cache_control):
+        if self.fail:
+            raise OSError("S3 unavailable")
+        super().write(name, body, cache_control)
+
+
+def publish(publisher, table):
+    return snapshot.publish_snapshot(publisher, table, "ByMonth", "2026-01-01")
+
+
+def test_skips_only_when_the_dataset_version_is_published(tmp_path):
+    table = MemoryTable()
+    publisher = FlakyPublisher(str(tmp_path))
+
+    assert publish(publisher, table) is not None
+    assert publish(publisher, table) is None
+
+    match_store.bump_dataset_version(table)
+    assert publish(publisher, table) is not None
+    pointer = json.loads((tmp_path / snapshot.POINTER_NAME).read_text())
+    assert pointer["datasetVersion"] == 1
+
+
+def test_failed_publish_is_retried_without_new_games(tmp_path):
+    table = MemoryTable()
+    publisher = FlakyPublisher(str(tmp_path))
+    publish(publisher, table)
+
+    match_store.bump_dataset_version(table)  # a run saved rows...
+    publisher.fail = True
+    with pytest.raises(OSError):
+        publish(publisher, table)  # ...but publishing failed
+
+    publisher.fail = False
+    assert publish(publisher, table) is not None  # next run, nothing new saved
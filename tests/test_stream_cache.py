@@ -0,0 +1,55 @@
+import league_logic
+from fakes import FakeRiot, make_match
+from riot_client import CACHE_FOREVER
+
+TRACKED = {"pa": "A#NA1"}
+
+
+def fetch_rows(client):
+    data = league_logic.fetch_match_data("NA1_1", "americas", client, TRACKED)
+    return league_logic.extract_match_stats("NA1_1", data, TRACKED)
+
+
+def riot():
+    return FakeRiot({}, {"NA1_1": make_match("NA1_1", ["pa", "pb"])})
+
+
+def test_streamed_fetch_writes_the_whole_body_to_the_cache(tmp_path):
+    fake = riot()
+    client = fake.client(cache_dir=str(tmp_path))
+
+    rows = fetch_rows(client)
+
+    assert [row["puuid"] for row in rows] == ["pa"]
+    assert "match-v5.match (streamed)" in client.parse_stats.snapshot()
+    body = client.cache.load("americas/lol/match/v5/matches/NA1_1?", CACHE_FOREVER)
+    live = fake.get("https://americas.api.riotgames.com/lol/match/v5/matches/NA1_1")
+    assert body == live.content
+
+
+def test_cache_hits_use_the_c_decoder(tmp_path):
+    fake = riot()
+    client = fake.client(cache_dir=str(tmp_path))
+    first = fetch_rows(client)
+    client.parse_stats.reset()
+
+    second = fetch_rows(client)
+
+    assert second == first
+    assert len(fake.match_calls()) == 1
+    assert list(client.parse_stats.snapshot()) == ["match-v5.match"]
+
+
+def test_unfinished_stream_is_not_cached(tmp_path):
+    client = riot().client(cache_dir=str(tmp_path))
+    response = client.get(
+        "americas",
+        "/lol/match/v5/matches/NA1_1",
+        cache_ttl=CACHE_FOREVER,
+        stream=True,
+    )
+    chunks = response.iter_content(16)
+    next(chunks)
+    chunks.close()
+
+    assert list(tmp_path.iterdir()) == []